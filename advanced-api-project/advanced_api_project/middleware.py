@@ -0,0 +1,317 @@
+# advanced_api_project/middleware.py
+import contextlib
+import contextvars
+import logging
+import os
+import secrets
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:  # optional: "br" is offered only when installed
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional: "zstd" is offered only when installed
+    zstandard = None
+
+logger = logging.getLogger("server_timing")
+
+_current_timing = contextvars.ContextVar("server_timing", default=None)
+
+
+class RequestTiming:
+    """
+    Timings collected for one request.
+    Called by execute_wrapper() to count queries and DB time.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.phases = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - start
+            self.queries += 1
+
+    def add(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+
+def execute_wrapper(execute, sql, params, many, context):
+    """
+    Installed on every connection. Connections are per thread and the async
+    ORM runs queries in a worker thread, so the request is found through the
+    context variable (which sync_to_async carries over) and not the connection.
+    """
+    timing = _current_timing.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    return timing(execute, sql, params, many, context)
+
+
+def install_execute_wrapper(connection, **kwargs):
+    if execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(execute_wrapper)
+
+
+connection_created.connect(install_execute_wrapper)
+
+
+@contextlib.contextmanager
+def timed(name):
+    """
+    Time a block of view code (e.g. timed("serialize")) into the current
+    request's Server-Timing header. Does nothing outside a request.
+    """
+    timing = _current_timing.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timing is not None:
+            timing.add(name, time.perf_counter() - start)
+
+
+class ServerTimingMiddleware:
+    """
+    Adds a Server-Timing header and a structured log line to every response:
+    query count, DB time, serializer time (where views use timed()),
+    render time and total time.
+    Queries are counted with a connection execute wrapper, so it does not
+    need DEBUG and is cheap enough to leave on in production.
+    Put it first in MIDDLEWARE so "total" covers the other middleware.
+    """
+
+    sync_capable = True
+    async_capable = True  # async views stay async under ASGI
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        # Connections opened before the middleware was loaded
+        for alias in connections:
+            install_execute_wrapper(connections[alias])
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timing, token, start = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_timing.reset(token)
+        return self.finish(request, response, timing, start)
+
+    async def __acall__(self, request):
+        timing, token, start = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_timing.reset(token)
+        return self.finish(request, response, timing, start)
+
+    def start(self):
+        timing = RequestTiming()
+        return timing, _current_timing.set(timing), time.perf_counter()
+
+    def finish(self, request, response, timing, start):
+        total = time.perf_counter() - start
+
+        noun = "query" if timing.queries == 1 else "queries"
+        metrics = [("db", timing.db, f"{timing.queries} {noun}")]
+        metrics += [(name, seconds, None) for name, seconds in timing.phases.items()]
+        metrics.append(("total", total, None))
+        response["Server-Timing"] = ", ".join(
+            f"{name};dur={seconds * 1000:.2f}" + (f';desc="{desc}"' if desc else "")
+            for name, seconds, desc in metrics
+        )
+
+        fields = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": timing.queries,
+            **{f"{name}_ms": round(seconds * 1000, 2) for name, seconds, _ in metrics},
+        }
+        logger.info(" ".join(f"{key}={value}" for key, value in fields.items()), extra=fields)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this hook; time until the
+        # post-render callback fires
+        timing = _current_timing.get()
+        if timing is not None:
+            start = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: timing.add("render", time.perf_counter() - start)
+            )
+        return response
+
+
+# --- Response compression ---
+
+# Every encoding gets 1-100 random bytes that decoders ignore, so the response
+# length no longer tracks the compressed size exactly (BREACH mitigation, the
+# same padding Django's GZipMiddleware adds to gzip)
+MAX_RANDOM_BYTES = 100
+ZSTD_SKIPPABLE_MAGIC = 0x184D2A50
+
+
+def random_padding():
+    return os.urandom(secrets.randbelow(MAX_RANDOM_BYTES) + 1)
+
+
+def gzip_compress(data):
+    # Padding goes in the gzip header's file name field
+    return compress_string(data, max_random_bytes=MAX_RANDOM_BYTES)
+
+
+def brotli_compress(data):
+    # After an empty flush the stream is byte-aligned, so a metadata meta-block
+    # holding the padding can follow: ISLAST=0, MNIBBLES=0 (metadata),
+    # MSKIPBYTES=1, then MSKIPLEN-1, padded to a 16-bit header
+    compressor = brotli.Compressor(quality=5)
+    stream_header = compressor.process(b"") + compressor.flush()
+    padding = random_padding()
+    metadata = (3 << 1) | (1 << 4) | ((len(padding) - 1) << 6)
+    return (
+        stream_header + metadata.to_bytes(2, "little") + padding
+        + compressor.process(data) + compressor.finish()
+    )
+
+
+def zstd_compress(data):
+    # A skippable frame holding the padding, before the data frame
+    padding = random_padding()
+    skippable = (
+        ZSTD_SKIPPABLE_MAGIC.to_bytes(4, "little") + len(padding).to_bytes(4, "little") + padding
+    )
+    return skippable + zstandard.ZstdCompressor(level=3).compress(data)
+
+
+COMPRESSORS = {"gzip": gzip_compress}
+if brotli is not None:
+    COMPRESSORS["br"] = brotli_compress
+if zstandard is not None:
+    COMPRESSORS["zstd"] = zstd_compress
+
+
+def parse_accept_encoding(header):
+    """{"gzip": 1.0, "br": 0.5, ...} from an Accept-Encoding header."""
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted["gzip" if name == "x-gzip" else name] = quality
+    return accepted
+
+
+def choose_encoding(header, preference):
+    """The client's highest-q encoding; ties go to the earlier entry in `preference`."""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in preference:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compresses responses of at least COMPRESSION_MIN_SIZE bytes with the best
+    encoding both sides support: zstd and br when their packages are installed,
+    gzip always (order set by COMPRESSION_ENCODINGS).
+    - Streaming responses are gzipped on the fly, like GZipMiddleware
+    - A response may carry `precompressed` ({encoding: bytes}), used instead
+      of compressing again, and `on_compressed(encoding, data)`, called after
+      compressing so the caller can keep the bytes (see api/cache.py)
+    Put it right after ServerTimingMiddleware; compression shows up there as "compress".
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_size = getattr(settings, "COMPRESSION_MIN_SIZE", 1024)
+        preference = getattr(settings, "COMPRESSION_ENCODINGS", ["zstd", "br", "gzip"])
+        self.encodings = [encoding for encoding in preference if encoding in COMPRESSORS]
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding"):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        header = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        if response.streaming:
+            encoding = choose_encoding(header, ["gzip"] if "gzip" in self.encodings else [])
+        else:
+            encoding = choose_encoding(header, self.encodings)
+        if encoding is None:
+            return response
+
+        with timed("compress"):
+            if response.streaming:
+                self.compress_stream(response)
+            else:
+                compressed = getattr(response, "precompressed", {}).get(encoding)
+                if compressed is None:
+                    compressed = COMPRESSORS[encoding](response.content)
+                    if len(compressed) >= len(response.content):
+                        return response
+                    on_compressed = getattr(response, "on_compressed", None)
+                    if on_compressed is not None:
+                        on_compressed(encoding, compressed)
+                response.content = compressed
+                response.headers["Content-Length"] = str(len(compressed))
+
+        # A strong ETag names the identity bytes; make it weak (RFC 9110 8.8.1)
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    def compress_stream(self, response):
+        if response.is_async:
+            chunks = response.streaming_content
+
+            async def gzip_chunks():
+                async for chunk in chunks:
+                    yield gzip_compress(chunk)
+
+            response.streaming_content = gzip_chunks()
+        else:
+            response.streaming_content = compress_sequence(
+                response.streaming_content, max_random_bytes=100
+            )
+        # The compressed length is only known once streamed
+        del response.headers["Content-Length"]
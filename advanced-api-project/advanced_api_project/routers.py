@@ -0,0 +1,120 @@
+# advanced_api_project/routers.py
+import contextvars
+import random
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Primary/replica database routing.
+# ReplicaRoutingMiddleware decides per request whether reads may go to a
+# replica (safe methods only, and not right after this client wrote);
+# PrimaryReplicaRouter applies that decision to every query. Outside a
+# request (shell, management commands, signals) everything uses the primary.
+
+_current_routing = contextvars.ContextVar("db_routing", default=None)
+
+
+def get_replicas():
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+class RequestRouting:
+    """Routing decision for one request."""
+
+    def __init__(self, use_replicas):
+        self.use_replicas = use_replicas
+        self.wrote = False
+
+
+def using_replicas():
+    """True when reads in the current request go to a replica."""
+    routing = _current_routing.get()
+    return bool(routing and routing.use_replicas and get_replicas())
+
+
+class PrimaryReplicaRouter:
+    """
+    Sends reads to a random DATABASE_REPLICAS alias when the current request
+    allows it, and everything else to the primary ("default").
+    A write pins the rest of the request to the primary so it reads its own
+    writes. Replicas are never migrated: they get the schema by copying.
+    """
+
+    def db_for_read(self, model, **hints):
+        if using_replicas():
+            return random.choice(get_replicas())
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        routing = _current_routing.get()
+        if routing is not None:
+            routing.use_replicas = False
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        pool = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_replicas():
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Lets GET/HEAD/OPTIONS requests read from the replicas. Any other method,
+    or a request that wrote, sets a cookie that keeps the client on the
+    primary for REPLICA_STICKY_SECONDS, so it reads its own writes even when
+    the replicas lag behind.
+    Put it before SessionMiddleware so session writes count as writes.
+    """
+    sync_capable = True
+    async_capable = True
+    safe_methods = ("GET", "HEAD", "OPTIONS")
+    cookie_name = "use_primary_db"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sticky_seconds = getattr(settings, "REPLICA_STICKY_SECONDS", 5)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        routing, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_routing.reset(token)
+        return self.finish(request, response, routing)
+
+    async def __acall__(self, request):
+        routing, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_routing.reset(token)
+        return self.finish(request, response, routing)
+
+    def start(self, request):
+        use_replicas = (
+            request.method in self.safe_methods
+            and self.cookie_name not in request.COOKIES
+        )
+        routing = RequestRouting(use_replicas)
+        return routing, _current_routing.set(routing)
+
+    def finish(self, request, response, routing):
+        if routing.wrote or request.method not in self.safe_methods:
+            response.set_cookie(
+                self.cookie_name, "1", max_age=self.sticky_seconds, httponly=True, samesite="Lax"
+            )
+        return response
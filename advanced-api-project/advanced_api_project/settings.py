@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import importlib.util
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,6 +46,9 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    'advanced_api_project.middleware.ServerTimingMiddleware',  # first, so "total" covers everything
+    'advanced_api_project.middleware.CompressionMiddleware',  # before anything else touches the body
+    'advanced_api_project.routers.ReplicaRoutingMiddleware',  # before sessions, so their writes count
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -80,10 +85,64 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Take the write lock when a transaction starts: a deferred transaction
+        # that reads first can't upgrade its lock and fails with "database is locked"
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+    }
+}
+
+# Read replicas (advanced_api_project/routers.py): safe-method requests read from
+# these aliases, writes and read-after-write requests use 'default'.
+# USE_SQLITE_REPLICA=1 adds a local SQLite replica; copy the primary into it with
+# `python manage.py sync_replicas`.
+DATABASE_REPLICAS = []
+if os.environ.get('USE_SQLITE_REPLICA'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append('replica')
+
+DATABASE_ROUTERS = ['advanced_api_project.routers.PrimaryReplicaRouter']
+
+# How long a client keeps reading from the primary after a write
+REPLICA_STICKY_SECONDS = 5
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Holds the book list response cache (api/cache.py). Use a shared backend
+# such as Redis or Memcached when running more than one process.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
 
+# Logging
+# ServerTimingMiddleware writes one line per request to the "server_timing" logger.
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'server_timing': {
+            'handlers': ['console'],
+            'level': 'WARNING',  # set to INFO to log request timings
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -125,6 +184,12 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Response compression (advanced_api_project.middleware.CompressionMiddleware):
+# smallest body worth compressing, and encodings in order of preference
+# ("br" needs the brotli package, "zstd" the zstandard package)
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_ENCODINGS = ["zstd", "br", "gzip"]
+
 REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
@@ -138,5 +203,19 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ],
+    # JSON by default; MessagePack (below) for clients that ask for it in Accept / Content-Type
+    "DEFAULT_RENDERER_CLASSES": [
+        "rest_framework.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "rest_framework.parsers.JSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
+# MessagePack is optional: offered only when the msgpack package is installed
+if importlib.util.find_spec("msgpack") is not None:
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"].append("api.renderers.MessagePackRenderer")
+    REST_FRAMEWORK["DEFAULT_PARSER_CLASSES"].append("api.parsers.MessagePackParser")
@@ -0,0 +1,146 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.views import View
+from django_filters import ModelChoiceFilter, ModelMultipleChoiceFilter
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.request import Request
+
+from advanced_api_project.middleware import timed
+
+from .conditional import ConditionalListMixin, fields_key, make_etag, set_validators
+from .fast_serializers import ValuesSerializer
+from .models import Book
+from .pagination import BookCursorPagination
+from .renderers import dumps
+from .serializers import BookSerializer
+from .sparse_fields import SparseFieldsMixin
+from .views import BookFilterMixin
+
+# Async variants of the book list/detail views for ASGI deployments.
+# DRF's APIView only dispatches synchronously, so these are plain Django async
+# views that reuse the same filter backends, paginator, sparse fieldsets and
+# .values() serializer as the sync views, and read rows with the async ORM
+# (aiterator()/aget()). Responses are JSON only, and they are read-only
+# endpoints, so no authentication runs.
+
+
+class AsyncBookViewMixin(SparseFieldsMixin, BookFilterMixin):
+    """
+    The parts of GenericAPIView the filter backends and SparseFieldsMixin use.
+    """
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+    required_columns = ["updated_at"]
+    media_type = "application/json"
+
+    async def dispatch(self, request, *args, **kwargs):
+        # Filter backends read request.query_params
+        self.request = Request(request)
+        self.request.accepted_media_type = self.media_type
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except APIException as exc:
+            data = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+            return self.json_response(data, status=exc.status_code)
+
+    def get_queryset(self):
+        return self.queryset.all()
+
+    def get_serializer_class(self):
+        return self.serializer_class
+
+    def get_values_serializer(self):
+        return ValuesSerializer(
+            self.get_serializer_class(),
+            fields=self.get_requested_fields(),
+            context={"request": self.request, "view": self},
+        )
+
+    def get_values_queryset(self, queryset, values_serializer):
+        columns = values_serializer.columns + self.required_columns
+        return queryset.values(*dict.fromkeys(columns))
+
+    def json_response(self, data, status=200):
+        return HttpResponse(dumps(data), content_type=self.media_type, status=status)
+
+
+class AsyncBookListView(ConditionalListMixin, AsyncBookViewMixin, View):
+    """
+    Async version of BookListView: same filtering, searching, ordering,
+    cursor pagination, sparse fieldsets and ETags, without the response cache.
+    """
+    pagination_class = BookCursorPagination
+    chunk_size = 2000
+
+    def run_filter_backends(self, queryset):
+        for backend in self.filter_backends:
+            queryset = backend().filter_queryset(self.request, queryset, self)
+        return queryset
+
+    def filters_query_database(self):
+        # ModelChoiceFilter (?author=) checks the id exists with a query while
+        # validating; every other filter only builds the queryset
+        filterset_class = DjangoFilterBackend().get_filterset_class(self, self.queryset)
+        return any(
+            isinstance(field, (ModelChoiceFilter, ModelMultipleChoiceFilter))
+            and name in self.request.query_params
+            for name, field in filterset_class.base_filters.items()
+        )
+
+    async def filter_queryset(self, queryset):
+        if self.filters_query_database():
+            return await sync_to_async(self.run_filter_backends)(queryset)
+        return self.run_filter_backends(queryset)
+
+    async def get(self, request, *args, **kwargs):
+        values_serializer = self.get_values_serializer()
+        queryset = await self.filter_queryset(self.get_queryset())
+        rows = self.get_values_queryset(queryset, values_serializer)
+
+        paginator = self.pagination_class()
+        page_queryset = paginator.get_page_queryset(rows, self.request)
+        if page_queryset is not None:
+            page = paginator.set_page([row async for row in page_queryset.aiterator()])
+            etag = self.get_page_etag(self.request, page)
+        else:
+            etag = await self.aget_list_etag(self.request, queryset)
+
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return set_validators(not_modified, etag, None)
+
+        if page_queryset is None:
+            page = [row async for row in rows.aiterator(chunk_size=self.chunk_size)]
+        with timed("serialize"):
+            data = values_serializer.to_representation(page)
+        if page_queryset is not None:
+            data = paginator.get_paginated_data(data)
+        return set_validators(self.json_response(data), etag, None)
+
+
+class AsyncBookDetailView(AsyncBookViewMixin, View):
+    """
+    Async version of BookDetailView: one aget() on .values(), same ETags and
+    sparse fieldsets.
+    """
+
+    async def get(self, request, pk):
+        values_serializer = self.get_values_serializer()
+        rows = self.get_values_queryset(self.get_queryset(), values_serializer)
+        try:
+            row = await rows.aget(pk=pk)
+        except Book.DoesNotExist:
+            raise NotFound(f"No {Book._meta.object_name} matches the given query.")
+
+        updated_at = row["updated_at"]
+        etag = make_etag(self.media_type, pk, updated_at.isoformat(), fields_key(self))
+        last_modified = int(updated_at.timestamp())
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return set_validators(not_modified, etag, last_modified)
+
+        with timed("serialize"):
+            data = values_serializer.to_representation([row])[0]
+        return set_validators(self.json_response(data), etag, last_modified)
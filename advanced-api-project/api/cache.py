@@ -0,0 +1,128 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe, urlencode
+
+from advanced_api_project.routers import using_replicas
+
+# Versioned response cache for the book list.
+# Cache keys include a catalog "generation" number. Any Book/Author write bumps
+# the generation (see api/signals.py), so every older entry simply stops being
+# looked up and expires on its own; there is never a need to scan or delete keys.
+
+CATALOG_VERSION_KEY = "api:catalog-version"
+
+
+def _fresh_version():
+    # Never a generation used before the key went missing (first use, eviction),
+    # so neither old cache entries nor old list ETags come back
+    return time.time_ns() // 1000
+
+
+def get_catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        version = _fresh_version()
+        if not cache.add(CATALOG_VERSION_KEY, version, timeout=None):
+            version = cache.get(CATALOG_VERSION_KEY, version)
+    return version
+
+
+def _incr_catalog_version():
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        # Key missing: a fresh value invalidates just like an increment
+        cache.set(CATALOG_VERSION_KEY, _fresh_version(), timeout=None)
+
+
+def bump_catalog_version():
+    """
+    Invalidate every cached catalog response.
+    Bumps now, and again once the transaction commits so a reader cannot
+    cache pre-commit data under the new generation.
+    """
+    _incr_catalog_version()
+    transaction.on_commit(_incr_catalog_version)
+
+
+class CatalogCacheMixin:
+    """
+    Caches the rendered response of a list view under the catalog generation.
+    - Key: generation + host + negotiated media type + normalized query string,
+      plus whether the request reads from a replica or the primary
+    - Only successful, non-browsable (e.g. JSON) GET responses are stored
+    - A hit returns the stored bytes without touching the ORM or serializer;
+      stored ETag/Last-Modified headers still answer conditional requests
+    - Bytes compressed by CompressionMiddleware are stored in the entry too,
+      so a hot response is compressed once per encoding, not once per hit
+    """
+    cache_timeout = 300
+    cache_prefix = "api:books"
+    uncached_formats = ["api"]  # browsable API pages include the user and CSRF token
+    cached_headers = ["ETag", "Last-Modified"]
+
+    def get_cache_key(self, request):
+        if request.method != "GET":
+            return None
+        if request.accepted_renderer.format in self.uncached_formats:
+            return None
+        params = urlencode(sorted(request.query_params.lists()), doseq=True)
+        raw = "|".join([request.get_host(), request.accepted_media_type, params])
+        digest = hashlib.md5(raw.encode("utf-8")).hexdigest()
+        # Replica reads may lag, so they never answer a client pinned to the primary
+        source = "replica" if using_replicas() else "primary"
+        return f"{self.cache_prefix}:{get_catalog_version()}:{source}:{digest}"
+
+    def list(self, request, *args, **kwargs):
+        key = self.get_cache_key(request)
+        if key is None:
+            return super().list(request, *args, **kwargs)
+
+        entry = cache.get(key)
+        if entry is not None:
+            return self.cached_response(request, key, entry)
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.add_post_render_callback(
+                lambda rendered: self.store_response(key, rendered)
+            )
+            response.on_compressed = lambda encoding, data: self.store_compressed(key, encoding, data)
+        return response
+
+    def store_response(self, key, response):
+        entry = {
+            "content": response.content,
+            "content_type": response["Content-Type"],
+            "headers": {
+                name: response[name] for name in self.cached_headers if response.has_header(name)
+            },
+            "compressed": {},  # encoding -> bytes, filled in by store_compressed()
+        }
+        cache.set(key, entry, self.cache_timeout)
+
+    def store_compressed(self, key, encoding, data):
+        entry = cache.get(key)
+        if entry is not None:
+            entry.setdefault("compressed", {})[encoding] = data
+            cache.set(key, entry, self.cache_timeout)
+
+    def cached_response(self, request, key, entry):
+        response = HttpResponse(entry["content"], content_type=entry["content_type"])
+        for name, value in entry["headers"].items():
+            response[name] = value
+        response["X-Cache"] = "HIT"
+        response.precompressed = entry.get("compressed", {})
+        response.on_compressed = lambda encoding, data: self.store_compressed(key, encoding, data)
+        last_modified = entry["headers"].get("Last-Modified")
+        return get_conditional_response(
+            request,
+            etag=entry["headers"].get("ETag"),
+            last_modified=last_modified and parse_http_date_safe(last_modified),
+            response=response,
+        )
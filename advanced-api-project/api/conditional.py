@@ -0,0 +1,129 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag, urlencode
+from rest_framework.response import Response
+
+from advanced_api_project.middleware import timed
+
+from .cache import get_catalog_version
+
+# Conditional GET (ETag / Last-Modified) for the book endpoints.
+# Validators come from Book.updated_at, never from the rendered body:
+# - detail: the row's id and updated_at, plus the ?fields= set it was rendered with
+# - list: MAX(updated_at) and COUNT(*) over the filtered queryset, plus the
+#   catalog generation so author renames (which change ?search= results) count.
+#   Lists send no Last-Modified: deleting a row doesn't move MAX(updated_at),
+#   so an If-Modified-Since-only client would keep getting 304 for stale lists.
+
+
+def make_etag(*parts):
+    raw = "|".join(str(part) for part in parts)
+    return quote_etag(hashlib.md5(raw.encode("utf-8")).hexdigest())
+
+
+def row_value(row, name):
+    """Read a column from a model instance or a .values() dict."""
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+def fields_key(view):
+    """The normalized ?fields= set of a SparseFieldsMixin view, "" for the full representation."""
+    get_requested_fields = getattr(view, "get_requested_fields", None)
+    fields = get_requested_fields() if get_requested_fields else None
+    return ",".join(sorted(set(fields))) if fields else ""
+
+
+def set_validators(response, etag, last_modified):
+    if etag and not response.has_header("ETag"):
+        response["ETag"] = etag
+    if last_modified and not response.has_header("Last-Modified"):
+        response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+class ConditionalRetrieveMixin:
+    """
+    Adds ETag/Last-Modified to retrieve() and answers 304 Not Modified.
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag = make_etag(
+            request.accepted_media_type, instance.pk, instance.updated_at.isoformat(), fields_key(self)
+        )
+        last_modified = int(instance.updated_at.timestamp())
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return set_validators(not_modified, etag, last_modified)
+
+        with timed("serialize"):
+            data = self.get_serializer(instance).data
+        return set_validators(Response(data), etag, last_modified)
+
+
+class ConditionalListMixin:
+    """
+    Adds an ETag to list() and answers 304 Not Modified without serializing
+    anything.
+    - Full list: validators come from one MAX/COUNT aggregate query
+    - Cursor-paginated page: validators come from the fetched page rows,
+      so pagination still never runs COUNT(*)
+    Rows may be model instances or .values() dicts (see get_list_rows()).
+    """
+
+    list_aggregates = {"last": Max("updated_at"), "count": Count("id")}
+
+    def get_list_etag(self, request, queryset):
+        stats = queryset.order_by().aggregate(**self.list_aggregates)
+        return self.build_etag(request, stats["count"], stats["last"])
+
+    async def aget_list_etag(self, request, queryset):
+        stats = await queryset.order_by().aaggregate(**self.list_aggregates)
+        return self.build_etag(request, stats["count"], stats["last"])
+
+    def get_page_etag(self, request, page):
+        rows = [(row_value(book, "id"), row_value(book, "updated_at")) for book in page]
+        last = max((updated_at for _, updated_at in rows), default=None)
+        rows = [(pk, updated_at.isoformat()) for pk, updated_at in rows]
+        return self.build_etag(request, rows, last)
+
+    def build_etag(self, request, state, last):
+        params = urlencode(sorted(request.query_params.lists()), doseq=True)
+        return make_etag(
+            request.accepted_media_type, params, get_catalog_version(),
+            state, last.isoformat() if last else "",
+        )
+
+    def get_list_rows(self, queryset):
+        """Hook to turn the filtered queryset into the rows to paginate/serialize."""
+        return queryset
+
+    def serialize_list(self, rows):
+        return self.get_serializer(rows, many=True).data
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = self.get_list_rows(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            etag = self.get_page_etag(request, page)
+        else:
+            etag = self.get_list_etag(request, queryset)
+
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return set_validators(not_modified, etag, None)
+
+        if page is not None:
+            with timed("serialize"):
+                data = self.serialize_list(page)
+            response = self.get_paginated_response(data)
+        else:
+            rows = list(rows)  # run the query outside the serializer timing
+            with timed("serialize"):
+                data = self.serialize_list(rows)
+            response = Response(data)
+        return set_validators(response, etag, None)
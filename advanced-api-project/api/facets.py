@@ -0,0 +1,143 @@
+from collections import Counter
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from .models import Author, Book, BookFacet
+
+# Incrementally maintained book counts for api.Book.
+# Book signals turn every write into +1/-1 deltas per facet value (see
+# api/signals.py), so reading a facet costs one query over its buckets instead
+# of a GROUP BY over the table:
+# - per author: the Author.book_count column
+# - per publication year: BookFacet rows
+# bulk_create() and queryset.update() skip signals; call count_books() or run
+# `python manage.py rebuild_book_facets` after those.
+
+# facet name -> Book attribute holding the bucket value
+FACET_FIELDS = {"publication_year": "publication_year", "author": "author_id"}
+
+# Backends that support INSERT ... ON CONFLICT DO UPDATE
+UPSERT_VENDORS = ("sqlite", "postgresql")
+
+
+def facet_values(book):
+    """The bucket of every facet for a Book instance (or a .values() dict)."""
+    if isinstance(book, dict):
+        return {facet: book[attname] for facet, attname in FACET_FIELDS.items()}
+    return {facet: getattr(book, attname) for facet, attname in FACET_FIELDS.items()}
+
+
+def book_changes(values, sign=1):
+    return Counter({(facet, value): sign for facet, value in values.items()})
+
+
+def apply_changes(changes):
+    """Add Counter({(facet, value): delta}) to the stored counts."""
+    deltas = {facet: {} for facet in FACET_FIELDS}
+    for (facet, value), delta in changes.items():
+        if delta:
+            deltas[facet][value] = delta
+    update_author_counts(deltas["author"])
+    rows = list(deltas["publication_year"].items())
+    if not rows:
+        return
+    if connection.vendor in UPSERT_VENDORS:
+        # One statement for every bucket, creating missing ones
+        table = BookFacet._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {table} (value, count) VALUES (%s, %s) "
+                f"ON CONFLICT (value) DO UPDATE SET count = {table}.count + excluded.count",
+                rows,
+            )
+        return
+    for value, delta in rows:
+        buckets = BookFacet.objects.filter(value=value)
+        if buckets.update(count=F("count") + delta):
+            continue
+        try:
+            with transaction.atomic():
+                BookFacet.objects.create(value=value, count=delta)
+        except IntegrityError:
+            # Another writer created the bucket first
+            buckets.update(count=F("count") + delta)
+
+
+def update_author_counts(deltas, batch_size=500):
+    """
+    Add {author_id: delta} to Author.book_count with F() expressions, so
+    concurrent writers never overwrite each other; one UPDATE per batch.
+    """
+    author_ids = list(deltas)
+    for start in range(0, len(author_ids), batch_size):
+        batch = author_ids[start:start + batch_size]
+        delta = Case(
+            *[When(pk=pk, then=Value(deltas[pk])) for pk in batch],
+            output_field=IntegerField(),
+        )
+        Author.objects.filter(pk__in=batch).update(book_count=F("book_count") + delta)
+
+
+def collect_changes(books, sign=1):
+    changes = Counter()
+    for book in books:
+        changes.update(book_changes(facet_values(book), sign))
+    return changes
+
+
+def count_books(books, sign=1):
+    """Add (sign=1) or remove (sign=-1) many books, one query per bucket touched."""
+    apply_changes(collect_changes(books, sign))
+
+
+def rebuild():
+    """Recount every facet from api_book (e.g. after bulk_create)."""
+    with transaction.atomic():
+        BookFacet.objects.all().delete()
+        BookFacet.objects.bulk_create(
+            BookFacet(value=row["value"], count=row["count"])
+            for row in Book.objects.order_by().values(value=F("publication_year"))
+            .annotate(count=Count("id"))
+        )
+        rebuild_author_counts()
+
+
+def rebuild_author_counts():
+    """Recompute Author.book_count in one UPDATE; returns the number of authors fixed."""
+    books = (
+        Book.objects.filter(author=OuterRef("pk")).order_by()
+        .values("author").annotate(count=Count("id")).values("count")
+    )
+    actual = Coalesce(Subquery(books), Value(0))
+    return (
+        Author.objects.alias(actual=actual)
+        .exclude(book_count=F("actual"))
+        .update(book_count=actual)
+    )
+
+
+def get_facet(facet):
+    """Stored buckets for one facet as [{"value", "count"}], ordered by value."""
+    if facet == "author":
+        authors = Author.objects.filter(book_count__gt=0).order_by("id")
+        return [
+            {"value": pk, "name": name, "count": count}
+            for pk, name, count in authors.values_list("id", "name", "book_count")
+        ]
+    return list(
+        BookFacet.objects.filter(count__gt=0)
+        .order_by("value")
+        .values("value", "count")
+    )
+
+
+def count_queryset(queryset, facet):
+    """The same buckets computed with GROUP BY over a (filtered) Book queryset."""
+    columns = {"value": F(FACET_FIELDS[facet])}
+    if facet == "author":
+        columns["name"] = F("author__name")
+    return list(
+        queryset.order_by().values(**columns).annotate(count=Count("id")).order_by("value")
+    )
@@ -0,0 +1,110 @@
+from rest_framework import ISO_8601, serializers
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.settings import api_settings
+
+from .renderers import FastJSONRenderer, MessagePackRenderer, msgpack
+
+# Read-only fast path for list responses.
+# Instead of instantiating a ModelSerializer per row, rows are read with
+# QuerySet.values() and converted with per-field mappers worked out once from
+# the ModelSerializer, producing the same data BookSerializer would.
+
+# Fields whose to_representation() is a no-op for values() output
+PASSTHROUGH_FIELDS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+def datetime_mapper(field):
+    """
+    DateTimeField.to_representation() looks up the active timezone for every
+    value; resolve it once and keep the common ISO 8601 case inline.
+    """
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != ISO_8601:
+        return field.to_representation
+    field_timezone = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+
+    def to_representation(value):
+        if field_timezone is None or isinstance(value, str) or value.tzinfo is None:
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return to_representation
+
+
+def get_mapper(field):
+    if isinstance(field, PASSTHROUGH_FIELDS):
+        return None
+    if isinstance(field, serializers.DateTimeField):
+        return datetime_mapper(field)
+    return field.to_representation
+
+
+class ValuesSerializer:
+    """
+    List-only stand-in for a ModelSerializer that works on .values() rows.
+    Supports plain model fields and primary-key relations.
+    """
+
+    def __init__(self, serializer_class, fields=None, context=None):
+        kwargs = {"context": context or {}}
+        if fields is not None:
+            kwargs["fields"] = fields
+        serializer = serializer_class(**kwargs)
+        model = serializer.Meta.model
+
+        self.spec = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            column = model._meta.get_field(field.source).attname
+            self.spec.append((name, column, get_mapper(field)))
+        self.columns = [column for _, column, _ in self.spec]
+
+    def to_representation(self, rows):
+        spec = self.spec
+        data = []
+        for row in rows:
+            item = {}
+            for name, column, mapper in spec:
+                value = row[column]
+                item[name] = value if mapper is None or value is None else mapper(value)
+            data.append(item)
+        return data
+
+
+class ValuesListMixin:
+    """
+    Serves JSON and MessagePack list responses through ValuesSerializer (JSON
+    encoded by FastJSONRenderer). Works with ConditionalListMixin, which calls
+    get_list_rows() and serialize_list(). Other formats (the browsable API)
+    keep the regular serializer.
+    """
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer] + (
+        [MessagePackRenderer] if msgpack is not None else []
+    )
+    plain_data_renderers = (FastJSONRenderer, MessagePackRenderer)
+    plain_json_data = False  # read by FastJSONRenderer
+
+    def get_list_rows(self, queryset):
+        if not isinstance(self.request.accepted_renderer, self.plain_data_renderers):
+            return super().get_list_rows(queryset)
+        fields = self.get_requested_fields() if hasattr(self, "get_requested_fields") else None
+        self.values_serializer = ValuesSerializer(
+            self.get_serializer_class(), fields=fields, context=self.get_serializer_context()
+        )
+        columns = self.values_serializer.columns + getattr(self, "required_columns", [])
+        self.plain_json_data = True
+        return queryset.values(*dict.fromkeys(columns))
+
+    def serialize_list(self, rows):
+        if not self.plain_json_data:
+            return super().serialize_list(rows)
+        return self.values_serializer.to_representation(rows)
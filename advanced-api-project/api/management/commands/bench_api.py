@@ -0,0 +1,229 @@
+import json
+import os
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, setup_test_environment
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import facets, search
+from api.cache import bump_catalog_version
+from api.models import Author, Book
+
+WORDS = [
+    "river", "night", "shadow", "garden", "empire", "silent", "stone", "winter",
+    "harvest", "voyage", "crown", "ember", "forest", "mirror", "thunder", "orchard",
+    "lantern", "desert", "kingdom", "whisper", "falcon", "harbor", "meadow", "ashes",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the Book API at scale. Seeds a separate SQLite database with bulk "
+        "inserts, then records p50/p95/p99 latency and queries per request for list, "
+        "detail, filter, search (paged and unpaged), ordering, facets and create. "
+        "Results are saved as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--books", type=int, default=100000)
+        parser.add_argument("--authors", type=int, default=5000)
+        parser.add_argument("--requests", type=int, default=200, help="Requests per scenario.")
+        parser.add_argument("--page-size", type=int, default=50)
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--database",
+            default=os.path.join(tempfile.gettempdir(), "advanced_api_bench.sqlite3"),
+            help="SQLite file used for the benchmark data (never the project database).",
+        )
+        parser.add_argument(
+            "--keepdb", action="store_true",
+            help="Reuse the benchmark database if it already holds the requested volume.",
+        )
+        parser.add_argument("--output", help="Write results to this JSON file.")
+        parser.add_argument("--compare", help="Earlier results JSON to print deltas against.")
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options["seed"])
+        setup_test_environment()
+
+        # Run against a throwaway database created like the test runner does
+        old_name = connection.settings_dict["NAME"]
+        connection.settings_dict.setdefault("TEST", {})["NAME"] = options["database"]
+        # serialize=False: nothing restores the data, and serializing a --keepdb
+        # database would load every row into memory
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options["keepdb"], serialize=False
+        )
+        try:
+            self.seed(options)
+            results = self.run_scenarios(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+
+        report = {
+            "commit": self.git_commit(),
+            "timestamp": timezone.now().isoformat(),
+            "books": options["books"],
+            "authors": options["authors"],
+            "requests": options["requests"],
+            "page_size": options["page_size"],
+            "results": results,
+        }
+        self.print_report(report, options.get("compare"))
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    # --- seeding ---
+
+    def seed(self, options):
+        if Book.objects.count() == options["books"] and Author.objects.count() == options["authors"]:
+            self.stdout.write("Reusing seeded benchmark database.")
+            return
+        Book.objects.all().delete()
+        Author.objects.all().delete()
+
+        start = time.perf_counter()
+        Author.objects.bulk_create(
+            (Author(name=f"{self.random.choice(WORDS).title()} Author {i}")
+             for i in range(options["authors"])),
+            batch_size=options["batch_size"],
+        )
+        author_ids = list(Author.objects.values_list("id", flat=True))
+        this_year = timezone.now().year
+
+        batch = []
+        for i in range(options["books"]):
+            title = " ".join(self.random.choice(WORDS) for _ in range(3)).title()
+            batch.append(Book(
+                title=f"{title} {i}",
+                publication_year=self.random.randint(1800, this_year),
+                author_id=self.random.choice(author_ids),
+            ))
+            if len(batch) == options["batch_size"]:
+                Book.objects.bulk_create(batch)
+                batch = []
+        Book.objects.bulk_create(batch)
+        search.rebuild()
+        facets.rebuild()
+        self.stdout.write(
+            f"Seeded {options['authors']} authors / {options['books']} books "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+
+    # --- scenarios ---
+
+    def run_scenarios(self, options):
+        client = APIClient()
+        user, _ = User.objects.get_or_create(username="bench")
+        writer = APIClient()
+        writer.force_authenticate(user)
+
+        book_ids = list(Book.objects.values_list("id", flat=True)[:10000])
+        author_id = Author.objects.values_list("id", flat=True).first()
+        list_url = reverse("book-list")
+        page = {"page_size": options["page_size"]}
+        this_year = timezone.now().year
+
+        scenarios = {
+            "list": lambda: client.get(list_url, page),
+            "list_cached": lambda: client.get(list_url, page),
+            "detail": lambda: client.get(reverse("book-detail", args=[self.random.choice(book_ids)])),
+            "filter": lambda: client.get(
+                list_url, {**page, "publication_year": self.random.randint(1800, this_year)}
+            ),
+            "search": lambda: client.get(list_url, {**page, "search": self.random.choice(WORDS)}),
+            # Without page_size: every match, in relevance order (the default list)
+            "search_all": lambda: client.get(list_url, {"search": self.random.choice(WORDS)}),
+            "ordering": lambda: client.get(list_url, {**page, "ordering": "-publication_year"}),
+            "facets": lambda: client.get(reverse("book-facets")),
+            "facets_filter": lambda: client.get(reverse("book-facets"), {"author": author_id}),
+            "create": lambda: writer.post(
+                reverse("book-create"),
+                {"title": "Benchmark Book", "publication_year": 2000, "author": author_id},
+            ),
+        }
+
+        results = {}
+        for name, request in scenarios.items():
+            # Every scenario but list_cached measures the uncached path
+            cold = name != "list_cached"
+            results[name] = self.measure(request, options["requests"], cold)
+
+        # Keep the seeded volume intact for --keepdb runs
+        Book.objects.filter(title="Benchmark Book").delete()
+        return results
+
+    def measure(self, request, count, cold):
+        timings = []
+        queries = []
+        for _ in range(count):
+            if cold:
+                bump_catalog_version()
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                response = request()
+                timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                raise RuntimeError(f"Benchmark request failed with {response.status_code}")
+            queries.append(len(ctx.captured_queries))
+
+        timings.sort()
+        return {
+            "p50_ms": round(self.percentile(timings, 50), 3),
+            "p95_ms": round(self.percentile(timings, 95), 3),
+            "p99_ms": round(self.percentile(timings, 99), 3),
+            "mean_ms": round(statistics.fmean(timings), 3),
+            "queries_per_request": round(statistics.fmean(queries), 2),
+        }
+
+    @staticmethod
+    def percentile(sorted_values, percent):
+        index = max(0, min(len(sorted_values) - 1, round(percent / 100 * len(sorted_values)) - 1))
+        return sorted_values[index]
+
+    # --- reporting ---
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def print_report(self, report, compare_path):
+        previous = {}
+        if compare_path:
+            with open(compare_path) as handle:
+                previous = json.load(handle)["results"]
+
+        self.stdout.write(
+            f"{report['books']} books / {report['authors']} authors, "
+            f"{report['requests']} requests per scenario (commit {report['commit']})"
+        )
+        self.stdout.write(
+            f"{'scenario':<14} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8}"
+            + (f" {'p50 vs base':>12}" if previous else "")
+        )
+        for name, result in report["results"].items():
+            line = (
+                f"{name:<14} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+                f"{result['p99_ms']:>9.2f} {result['queries_per_request']:>8.1f}"
+            )
+            if name in previous and previous[name]["p50_ms"]:
+                change = (result["p50_ms"] / previous[name]["p50_ms"] - 1) * 100
+                line += f" {change:>+11.1f}%"
+            self.stdout.write(line)
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import override_settings, setup_test_environment
+from django.urls import reverse
+from django.utils import timezone
+
+from api.models import Book
+
+from .bench_api import WORDS, Command as BenchAPICommand
+
+
+class Command(BenchAPICommand):
+    help = (
+        "Compare the sync and async Book views under concurrent load. Requests go "
+        "through Django's ASGI request path (AsyncClient) with up to N in flight, "
+        "against the same seeded SQLite database as bench_api. Reports p50/p95/p99 "
+        "latency and throughput per concurrency level."
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--concurrency", default="1,16,64,256",
+            help="Comma-separated numbers of requests in flight.",
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options["seed"])
+        setup_test_environment()
+
+        old_name = connection.settings_dict["NAME"]
+        connection.settings_dict.setdefault("TEST", {})["NAME"] = options["database"]
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options["keepdb"], serialize=False
+        )
+        try:
+            self.seed(options)
+            # Measure the ORM and serialization, not the response cache
+            with override_settings(
+                CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+            ):
+                results = asyncio.run(self.run_levels(options))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+
+        report = {
+            "commit": self.git_commit(),
+            "timestamp": timezone.now().isoformat(),
+            "books": options["books"],
+            "authors": options["authors"],
+            "requests": options["requests"],
+            "page_size": options["page_size"],
+            "results": results,
+        }
+        self.print_report(report, options.get("compare"))
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    async def run_levels(self, options):
+        book_ids = [pk async for pk in Book.objects.values_list("id", flat=True)[:10000]]
+        page = {"page_size": options["page_size"]}
+
+        def list_request(name):
+            return reverse(name), {**page, "search": self.random.choice(WORDS)}
+
+        def detail_request(name):
+            return reverse(name, args=[self.random.choice(book_ids)]), None
+
+        scenarios = {
+            "list": list_request,
+            "detail": detail_request,
+        }
+        variants = {"sync": "book-{}", "async": "async-book-{}"}
+
+        results = {}
+        for level in [int(value) for value in options["concurrency"].split(",")]:
+            for scenario, build in scenarios.items():
+                for variant, pattern in variants.items():
+                    name = pattern.format(scenario)
+                    results[f"{scenario}_{variant}_c{level}"] = await self.measure_concurrent(
+                        lambda: build(name), options["requests"], level
+                    )
+        return results
+
+    async def measure_concurrent(self, build, count, concurrency):
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+        timings = []
+
+        async def one():
+            url, params = build()
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(url, params)
+                timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                raise RuntimeError(f"Benchmark request failed with {response.status_code}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(count)))
+        elapsed = time.perf_counter() - start
+
+        timings.sort()
+        return {
+            "p50_ms": round(self.percentile(timings, 50), 3),
+            "p95_ms": round(self.percentile(timings, 95), 3),
+            "p99_ms": round(self.percentile(timings, 99), 3),
+            "mean_ms": round(statistics.fmean(timings), 3),
+            "requests_per_second": round(count / elapsed, 1),
+        }
+
+    def print_report(self, report, compare_path):
+        previous = {}
+        if compare_path:
+            with open(compare_path) as handle:
+                previous = json.load(handle)["results"]
+
+        self.stdout.write(
+            f"{report['books']} books / {report['authors']} authors, "
+            f"{report['requests']} requests per run (commit {report['commit']})"
+        )
+        self.stdout.write(
+            f"{'run':<20} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9}"
+            + (f" {'req/s vs base':>14}" if previous else "")
+        )
+        for name, result in report["results"].items():
+            line = (
+                f"{name:<20} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+                f"{result['p99_ms']:>9.2f} {result['requests_per_second']:>9.1f}"
+            )
+            if name in previous and previous[name]["requests_per_second"]:
+                change = (result["requests_per_second"] / previous[name]["requests_per_second"] - 1) * 100
+                line += f" {change:>+13.1f}%"
+            self.stdout.write(line)
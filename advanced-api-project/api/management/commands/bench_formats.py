@@ -0,0 +1,68 @@
+import gzip
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api.fast_serializers import ValuesSerializer
+from api.renderers import MessagePackRenderer, dumps, msgpack, orjson
+from api.serializers import BookSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare response formats for a book list: payload size (raw and gzipped) and "
+        "encode/decode time of JSON (stdlib, orjson) against MessagePack (each when installed). "
+        "Runs in memory, no database needed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+        parser.add_argument("--repeat", type=int, default=3, help="Best of N runs.")
+
+    def handle(self, *args, **options):
+        formats = {"json": (lambda data: JSONRenderer().render(data), json.loads)}
+        if msgpack is not None:
+            formats["msgpack"] = (lambda data: MessagePackRenderer().render(data), msgpack.unpackb)
+        if orjson is not None:
+            formats["orjson"] = (dumps, orjson.loads)
+
+        self.stdout.write(
+            f"{'rows':>8}  {'format':<8}  {'bytes':>11}  {'gzipped':>10}  "
+            f"{'encode ms':>10}  {'decode ms':>10}"
+        )
+        for count in options["rows"]:
+            data = ValuesSerializer(BookSerializer).to_representation(self.make_rows(count))
+            for name, (encode, decode) in formats.items():
+                encode_time, payload = self.best_of(lambda: encode(data), options["repeat"])
+                decode_time, decoded = self.best_of(lambda: decode(payload), options["repeat"])
+                if decoded != data:
+                    self.stderr.write(self.style.ERROR(f"{name}: round trip changed the data!"))
+                self.stdout.write(
+                    f"{count:>8}  {name:<8}  {len(payload):>11}  {len(gzip.compress(payload)):>10}  "
+                    f"{encode_time * 1000:>10.1f}  {decode_time * 1000:>10.1f}"
+                )
+
+    def make_rows(self, count):
+        now = timezone.now()
+        return [
+            {
+                "id": i,
+                "title": f"Book title number {i}",
+                "publication_year": 1900 + i % 120,
+                "author_id": i % 500 + 1,
+                "updated_at": now,
+            }
+            for i in range(1, count + 1)
+        ]
+
+    def best_of(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            output = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, output
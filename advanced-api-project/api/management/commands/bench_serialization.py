@@ -0,0 +1,64 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api.fast_serializers import ValuesSerializer
+from api.models import Book
+from api.renderers import dumps, orjson
+from api.serializers import BookSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Micro-benchmark of book list serialization: BookSerializer + JSONRenderer "
+        "against the .values() fast path. Runs in memory, no database needed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+        parser.add_argument("--repeat", type=int, default=3, help="Best of N runs.")
+
+    def handle(self, *args, **options):
+        encoder = "orjson" if orjson is not None else "json (stdlib)"
+        self.stdout.write(f"fast path encoder: {encoder}")
+        self.stdout.write(f"{'rows':>8}  {'serializer ms':>14}  {'values ms':>10}  {'speedup':>8}")
+
+        for count in options["rows"]:
+            now = timezone.now()
+            rows = [
+                {
+                    "id": i,
+                    "title": f"Book title number {i}",
+                    "publication_year": 1900 + i % 120,
+                    "author_id": i % 500 + 1,
+                    "updated_at": now,
+                }
+                for i in range(1, count + 1)
+            ]
+            books = [Book(**row) for row in rows]
+
+            def serializer_path():
+                return JSONRenderer().render(BookSerializer(books, many=True).data)
+
+            def values_path():
+                return dumps(ValuesSerializer(BookSerializer).to_representation(rows))
+
+            slow, slow_output = self.best_of(serializer_path, options["repeat"])
+            fast, fast_output = self.best_of(values_path, options["repeat"])
+            if slow_output != fast_output:
+                self.stderr.write(self.style.ERROR(f"{count} rows: outputs differ!"))
+
+            self.stdout.write(
+                f"{count:>8}  {slow * 1000:>14.1f}  {fast * 1000:>10.1f}  {slow / fast:>7.1f}x"
+            )
+
+    def best_of(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            output = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, output
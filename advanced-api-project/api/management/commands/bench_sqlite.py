@@ -0,0 +1,124 @@
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from advanced_api_project.sqlite import apply_pragmas, get_pragmas
+
+# The PRAGMA profile on a database that was switched to WAL once, as deployed
+WAL = {"journal_mode": "wal"}
+
+SCHEMA = """
+CREATE TABLE author (id INTEGER PRIMARY KEY, name TEXT, book_count INTEGER NOT NULL DEFAULT 0);
+CREATE TABLE book (
+    id INTEGER PRIMARY KEY, title TEXT, publication_year INTEGER,
+    author_id INTEGER REFERENCES author (id)
+);
+CREATE INDEX book_author_idx ON book (author_id);
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Write throughput of SQLite with Django's defaults against the PRAGMA profile "
+        "in settings.SQLITE_PRAGMAS on a WAL database, with N concurrent writer threads. Each "
+        "transaction reads like a book create does (author lookup), inserts a book "
+        "and bumps the author's book_count. Uses a temporary database file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, nargs="+", default=[1, 4, 16])
+        parser.add_argument("--transactions", type=int, default=300, help="Per writer.")
+        parser.add_argument("--authors", type=int, default=100)
+
+    def handle(self, *args, **options):
+        profiles = {
+            # Django's sqlite3 backend as configured out of the box
+            "default": ({}, "DEFERRED"),
+            "pragmas": ({**WAL, **get_pragmas()}, "DEFERRED"),
+            "pragmas+immediate": ({**WAL, **get_pragmas()}, "IMMEDIATE"),
+        }
+        self.stdout.write(
+            f"{'profile':<18} {'writers':>7} {'commits/s':>10} {'p50 ms':>8} "
+            f"{'p95 ms':>8} {'locked':>7}"
+        )
+        for writers in options["writers"]:
+            for name, (pragmas, mode) in profiles.items():
+                result = self.run_profile(pragmas, mode, writers, options)
+                self.stdout.write(
+                    f"{name:<18} {writers:>7} {result['commits_per_second']:>10.1f} "
+                    f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['locked']:>7}"
+                )
+
+    def run_profile(self, pragmas, mode, writers, options):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bench.sqlite3")
+            setup = self.connect(path, pragmas)
+            setup.executescript(SCHEMA)
+            setup.executemany(
+                "INSERT INTO author (name) VALUES (?)",
+                [(f"Author {i}",) for i in range(options["authors"])],
+            )
+            setup.close()
+
+            timings, locked = [], []
+            barrier = threading.Barrier(writers + 1)
+            threads = [
+                threading.Thread(
+                    target=self.writer,
+                    args=(path, pragmas, mode, seed, options, barrier, timings, locked),
+                )
+                for seed in range(writers)
+            ]
+            for thread in threads:
+                thread.start()
+            barrier.wait()
+            start = time.perf_counter()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+
+        timings.sort()
+        return {
+            "commits_per_second": len(timings) / elapsed,
+            "p50_ms": statistics.median(timings) * 1000 if timings else 0,
+            "p95_ms": timings[int(len(timings) * 0.95)] * 1000 if timings else 0,
+            "locked": len(locked),
+        }
+
+    def connect(self, path, pragmas):
+        # Autocommit at the driver level, like Django: transactions are explicit
+        connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        apply_pragmas(connection.cursor(), pragmas)
+        return connection
+
+    def writer(self, path, pragmas, mode, seed, options, barrier, timings, locked):
+        connection = self.connect(path, pragmas)
+        barrier.wait()
+        for i in range(options["transactions"]):
+            author_id = (seed * 7919 + i) % options["authors"] + 1
+            start = time.perf_counter()
+            try:
+                connection.execute(f"BEGIN {mode}")
+                connection.execute("SELECT id, name FROM author WHERE id = ?", (author_id,)).fetchone()
+                connection.execute(
+                    "INSERT INTO book (title, publication_year, author_id) VALUES (?, ?, ?)",
+                    (f"Book {seed}-{i}", 1900 + i % 120, author_id),
+                )
+                connection.execute(
+                    "UPDATE author SET book_count = book_count + 1 WHERE id = ?", (author_id,)
+                )
+                connection.execute("COMMIT")
+            except sqlite3.OperationalError as exc:
+                if "locked" not in str(exc) and "busy" not in str(exc):
+                    raise
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+                locked.append(exc)
+                continue
+            timings.append(time.perf_counter() - start)
+        connection.close()
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api import facets
+
+
+class Command(BaseCommand):
+    help = "Recount the book facet table (run after bulk loads)."
+
+    def handle(self, *args, **options):
+        facets.rebuild()
+        self.stdout.write(self.style.SUCCESS("Book facet counts rebuilt."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search table for books (run after bulk loads)."
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            self.stdout.write(self.style.WARNING("Full-text search needs SQLite; nothing to do."))
+            return
+        search.rebuild()
+        self.stdout.write(self.style.SUCCESS("Book search table rebuilt."))
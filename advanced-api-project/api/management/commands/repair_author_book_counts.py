@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api import facets
+
+
+class Command(BaseCommand):
+    help = "Recompute Author.book_count from api_book in one bulk UPDATE."
+
+    def handle(self, *args, **options):
+        fixed = facets.rebuild_author_counts()
+        self.stdout.write(self.style.SUCCESS(f"Repaired book_count on {fixed} author(s)."))
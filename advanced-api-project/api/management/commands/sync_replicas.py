@@ -0,0 +1,56 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from api.cache import bump_catalog_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database into the replica databases "
+        "(DATABASE_REPLICAS), for trying out replica routing locally."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database", action="append", dest="replicas",
+            help="Replica alias to refresh (repeatable; default: all of DATABASE_REPLICAS).",
+        )
+
+    def handle(self, *args, **options):
+        replicas = options["replicas"] or getattr(settings, "DATABASE_REPLICAS", [])
+        if not replicas:
+            raise CommandError("No replicas configured (set USE_SQLITE_REPLICA=1).")
+
+        primary = self.sqlite_path(DEFAULT_DB_ALIAS)
+        for alias in replicas:
+            if alias not in getattr(settings, "DATABASE_REPLICAS", []):
+                raise CommandError(f"{alias!r} is not listed in DATABASE_REPLICAS.")
+            self.copy_database(primary, self.sqlite_path(alias))
+            self.stdout.write(self.style.SUCCESS(f"Copied {DEFAULT_DB_ALIAS} -> {alias}"))
+
+        # Cached responses may have been built from the old replica contents
+        bump_catalog_version()
+
+    def sqlite_path(self, alias):
+        config = settings.DATABASES.get(alias)
+        if config is None:
+            raise CommandError(f"Unknown database {alias!r}.")
+        if config["ENGINE"] != "django.db.backends.sqlite3":
+            raise CommandError(
+                f"{alias!r} is not SQLite; use the database's own replication instead."
+            )
+        return str(config["NAME"])
+
+    def copy_database(self, source_path, target_path):
+        # The backup API takes a consistent snapshot even while the primary is in use
+        source = sqlite3.connect(source_path)
+        target = sqlite3.connect(target_path)
+        try:
+            with target:
+                source.backup(target)
+        finally:
+            target.close()
+            source.close()
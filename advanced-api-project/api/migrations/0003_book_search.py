@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+# Creates the SQLite FTS5 table behind BookFullTextSearchFilter (see api/search.py)
+# and fills it from the existing rows. Other databases skip this migration.
+
+def create_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS api_book_fts "
+            "USING fts5(title, author_name, tokenize='trigram')"
+        )
+        cursor.execute(
+            "INSERT INTO api_book_fts (rowid, title, author_name) "
+            "SELECT b.id, b.title, a.name FROM api_book b "
+            "JOIN api_author a ON a.id = b.author_id"
+        )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS api_book_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_book_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:53
+
+from django.db import migrations, models
+from django.db.models import Count, F
+
+
+# Fills the BookFacet counts from the existing rows (see api/facets.py)
+
+def count_existing_books(apps, schema_editor):
+    Book = apps.get_model("api", "Book")
+    BookFacet = apps.get_model("api", "BookFacet")
+    for facet, attname in [("publication_year", "publication_year"), ("author", "author_id")]:
+        rows = Book.objects.order_by().values(value=F(attname)).annotate(count=Count("id"))
+        BookFacet.objects.bulk_create(
+            BookFacet(facet=facet, value=row["value"], count=row["count"]) for row in rows
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_book_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(max_length=50)),
+                ('value', models.IntegerField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('facet', 'value'), name='book_facet_unique')],
+            },
+        ),
+        migrations.RunPython(count_existing_books, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:57
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+# Fills Author.book_count from the existing rows. Per-author counts used to be
+# stored as BookFacet rows, which the column replaces.
+
+def count_books_per_author(apps, schema_editor):
+    Author = apps.get_model("api", "Author")
+    Book = apps.get_model("api", "Book")
+    BookFacet = apps.get_model("api", "BookFacet")
+    books = (
+        Book.objects.filter(author=OuterRef("pk")).order_by()
+        .values("author").annotate(count=Count("id")).values("count")
+    )
+    Author.objects.update(book_count=Coalesce(Subquery(books), Value(0)))
+    BookFacet.objects.filter(facet="author").delete()
+
+
+def restore_author_facets(apps, schema_editor):
+    Author = apps.get_model("api", "Author")
+    BookFacet = apps.get_model("api", "BookFacet")
+    BookFacet.objects.bulk_create(
+        BookFacet(facet="author", value=pk, count=count)
+        for pk, count in Author.objects.filter(book_count__gt=0).values_list("id", "book_count")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_book_facets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='book_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='author',
+            index=models.Index(fields=['book_count', 'id'], name='author_book_count_idx'),
+        ),
+        migrations.RunPython(count_books_per_author, restore_author_facets),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Since 0006 every BookFacet row is a publication year: the facet column
+    # only widened each row and the unique index
+
+    dependencies = [
+        ('api', '0006_author_book_count'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='bookfacet',
+            name='book_facet_unique',
+        ),
+        # A default so that reversing can add the column back to existing rows
+        migrations.AlterField(
+            model_name='bookfacet',
+            name='facet',
+            field=models.CharField(default='publication_year', max_length=50),
+        ),
+        migrations.RemoveField(
+            model_name='bookfacet',
+            name='facet',
+        ),
+        migrations.AddConstraint(
+            model_name='bookfacet',
+            constraint=models.UniqueConstraint(fields=('value',), name='book_facet_value_unique'),
+        ),
+    ]
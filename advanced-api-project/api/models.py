@@ -3,6 +3,14 @@ from django.db import models
 # Author model: stores information about an author
 class Author(models.Model):
     name = models.CharField(max_length=100)  # Author's name
+    # Number of books; kept current by the Book signals (see api/facets.py)
+    book_count = models.IntegerField(default=0, editable=False)
+
+    class Meta:
+        # Authors by popularity (?ordering=-book_count)
+        indexes = [
+            models.Index(fields=["book_count", "id"], name="author_book_count_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -16,6 +24,37 @@ class Book(models.Model):
         related_name="books",  # allows Author.books to access all books
         on_delete=models.CASCADE
     )
+    updated_at = models.DateTimeField(auto_now=True)  # Last write; drives ETag/Last-Modified
+
+    class Meta:
+        # Indexes matching the filter/ordering combinations BookListView exposes
+        # (?title=, ?author=, ?publication_year= with ?ordering=title|publication_year).
+        # SQLite appends the rowid to every index, which covers the id tiebreaker
+        # used by cursor pagination.
+        indexes = [
+            models.Index(fields=["title"], name="book_title_idx"),
+            models.Index(fields=["publication_year"], name="book_year_idx"),
+            models.Index(fields=["publication_year", "title"], name="book_year_title_idx"),
+            models.Index(fields=["author", "title"], name="book_author_title_idx"),
+            models.Index(fields=["author", "publication_year"], name="book_author_year_idx"),
+            models.Index(fields=["updated_at"], name="book_updated_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.publication_year})"
+
+
+# BookFacet model: number of books per publication year, kept up to date by the
+# Book signals so facet counts never scan api_book (per-author counts are
+# Author.book_count)
+class BookFacet(models.Model):
+    value = models.IntegerField()  # the year
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["value"], name="book_facet_value_unique"),
+        ]
+
+    def __str__(self):
+        return f"publication_year={self.value}: {self.count}"
@@ -0,0 +1,189 @@
+import base64
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+# Keyset (cursor) pagination for the book list.
+# The page boundary is stored as (ordering value, id) of the last row seen,
+# so every page is a plain indexed range query: no OFFSET and no COUNT(*).
+class BookCursorPagination(BasePagination):
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = 20
+    max_page_size = 100
+
+    # Fields a cursor can be keyed on, with the JSON type of their values;
+    # "id" is always the tiebreaker
+    cursor_fields = {"title": str, "publication_year": int, "id": int}
+    default_ordering = "title"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Order, position and slice the queryset for the requested page without
+        running it (async views evaluate it with aiterator()), or None when
+        the request is not paginated. Pass the fetched rows to set_page().
+        """
+        # Opt-in: without ?cursor= or ?page_size= the full list is returned as before
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        field = self.ordering.lstrip("-")
+        descending = self.ordering.startswith("-")
+
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor["r"])
+
+        # Walking backwards means flipping the direction of the sort
+        direction = "-" if descending != reverse else ""
+        order_by = [direction + field]
+        if field != "id":
+            order_by.append(direction + "id")
+        queryset = queryset.order_by(*order_by)
+
+        # The cursor is built from the ordering field, so make sure a sparse
+        # fieldset (QuerySet.only() or .values()) still loads it
+        values = queryset.query.values_select
+        loaded, deferred = queryset.query.deferred_loading
+        if values and field not in values:
+            queryset = queryset.values(*values, field)
+        elif not values and not deferred and loaded and field not in loaded:
+            queryset = queryset.only(*loaded, field)
+
+        if cursor:
+            lookup = "lt" if direction else "gt"
+            position = Q(**{f"{field}__{lookup}": cursor["v"]})
+            if field != "id":
+                position |= Q(**{field: cursor["v"], f"id__{lookup}": cursor["i"]})
+            queryset = queryset.filter(position)
+
+        self.cursor = cursor
+        self.reverse = reverse
+        # Fetch one extra row to learn whether there is another page
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if self.reverse:
+            results.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_ordering(self, queryset):
+        # The view's OrderingFilter has already ordered the queryset;
+        # the first term decides what the cursor is keyed on.
+        order_by = queryset.query.order_by
+        ordering = order_by[0] if order_by else self.default_ordering
+        if not isinstance(ordering, str) or ordering.lstrip("-") not in self.cursor_fields:
+            ordering = self.default_ordering
+        return ordering
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            cursor = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            value, pk, reverse = cursor["v"], cursor["i"], cursor["r"]
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        # A cursor only makes sense for the ordering it was issued for
+        if cursor.get("o") != self.ordering:
+            raise NotFound(self.invalid_cursor_message)
+        # The values go straight into the page filter: check their types
+        value_type = self.cursor_fields[self.ordering.lstrip("-")]
+        if not (
+            self.is_type(value, value_type) and self.is_type(pk, int) and isinstance(reverse, bool)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    @staticmethod
+    def is_type(value, value_type):
+        # JSON true/false decode to bool, which is an int subclass
+        return isinstance(value, value_type) and not isinstance(value, bool)
+
+    def encode_cursor(self, obj, reverse):
+        field = self.ordering.lstrip("-")
+        if isinstance(obj, dict):  # .values() rows
+            value, pk = obj[field], obj["id"]
+        else:
+            value, pk = getattr(obj, field), obj.pk
+        data = {"o": self.ordering, "v": value, "i": pk, "r": reverse}
+        encoded = base64.urlsafe_b64encode(json.dumps(data).encode("utf-8"))
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded.decode("ascii").rstrip("="))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_data(self, data):
+        return {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+# Plain cursor pagination for the author list, keyed on the primary key
+class AuthorCursorPagination(CursorPagination):
+    ordering = "id"
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
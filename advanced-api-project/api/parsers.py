@@ -0,0 +1,21 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+try:
+    import msgpack
+except ImportError:  # optional: MessagePack is offered only when installed
+    msgpack = None
+
+
+class MessagePackParser(BaseParser):
+    """
+    Parses MessagePack request bodies (Content-Type: application/msgpack)
+    into the same Python data JSONParser would produce.
+    """
+    media_type = "application/msgpack"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
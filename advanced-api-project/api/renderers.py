@@ -0,0 +1,66 @@
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import msgpack
+except ImportError:  # optional: MessagePack is offered only when installed
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the standard library encoder
+    orjson = None
+
+
+def dumps(data):
+    """
+    Encode plain data (dicts, lists, str, int, bool, None) to the exact bytes
+    JSONRenderer produces with DRF's default settings, using orjson when it
+    is installed.
+    """
+    if orjson is not None:
+        content = orjson.dumps(data)
+    else:
+        content = json.dumps(data, ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+        content = content.encode("utf-8")
+    # Same escaping JSONRenderer applies for JavaScript compatibility
+    return content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with dumps() when the view says its data is
+    plain rows (see fast_serializers.ValuesListMixin); anything else, and
+    indented output, goes through the regular JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        view = (renderer_context or {}).get("view")
+        if (
+            data is not None
+            and getattr(view, "plain_json_data", False)
+            and not self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return dumps(data)
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    MessagePack: a compact binary encoding of the same data the JSON renderer
+    outputs, for API clients that send Accept: application/msgpack.
+    Values msgpack has no type for (dates, decimals, UUIDs...) are converted
+    the way DRF's JSON encoder converts them.
+    """
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+    encoder_class = encoders.JSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=self.encoder_class().default, use_bin_type=True)
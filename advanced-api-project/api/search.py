@@ -0,0 +1,145 @@
+import operator
+from functools import reduce
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+# Full-text search for api.Book on a SQLite FTS5 shadow table.
+# The table holds one row per book (rowid = book id) with the book title and
+# its author's name. The trigram tokenizer gives case-insensitive substring
+# matching, so ?search= keeps the same meaning as SearchFilter's icontains
+# lookups while being answered from the FTS index instead of LIKE '%term%'.
+
+FTS_TABLE = "api_book_fts"
+
+# Trigram indexes cannot match terms shorter than three characters
+MIN_TERM_LENGTH = 3
+
+
+def is_supported():
+    return connection.vendor == "sqlite"
+
+
+def rebuild():
+    """Repopulate the search table from api_book/api_author (e.g. after bulk_create)."""
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, author_name) "
+            "SELECT b.id, b.title, a.name FROM api_book b "
+            "JOIN api_author a ON a.id = b.author_id"
+        )
+
+
+def index_book(book):
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [book.pk])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, author_name) "
+            "SELECT %s, %s, name FROM api_author WHERE id = %s",
+            [book.pk, book.title, book.author_id],
+        )
+
+
+def index_books(books):
+    """Index many books at once (bulk_create/bulk_update skip the signals)."""
+    if not is_supported() or not books:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(book.pk,) for book in books]
+        )
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, author_name) VALUES (%s, %s, %s)",
+            [(book.pk, book.title, book.author.name) for book in books],
+        )
+
+
+def unindex_book(book_id):
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [book_id])
+
+
+def unindex_books(book_ids):
+    """Unindex many books at once (for deletes that skip the signals)."""
+    book_ids = list(book_ids)
+    if not is_supported() or not book_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(pk,) for pk in book_ids])
+
+
+def index_author(author):
+    """Refresh author_name on every indexed book by this author."""
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {FTS_TABLE} SET author_name = %s "
+            "WHERE rowid IN (SELECT id FROM api_book WHERE author_id = %s)",
+            [author.name, author.pk],
+        )
+
+
+def match_expression(terms):
+    # Each term becomes a quoted phrase so FTS5 operators in user input are literal
+    return " AND ".join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+class BookFullTextSearchFilter(filters.SearchFilter):
+    """
+    Drop-in replacement for SearchFilter on the book list.
+    - Same ?search= parameter and term splitting as SearchFilter
+    - Matching terms come from the FTS5 index; terms shorter than three
+      characters fall back to the regular icontains lookups
+    - Results are ordered by relevance (bm25) unless ?ordering= is given
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+
+        if not search_fields or not search_terms or not is_supported():
+            return super().filter_queryset(request, queryset, view)
+
+        fts_terms = [term for term in search_terms if len(term) >= MIN_TERM_LENGTH]
+        short_terms = [term for term in search_terms if len(term) < MIN_TERM_LENGTH]
+
+        if short_terms:
+            orm_lookups = [
+                self.construct_search(str(search_field), queryset)
+                for search_field in search_fields
+            ]
+            conditions = (
+                reduce(operator.or_, (Q(**{lookup: term}) for lookup in orm_lookups))
+                for term in short_terms
+            )
+            queryset = queryset.filter(reduce(operator.and_, conditions))
+
+        if not fts_terms:
+            return queryset
+
+        expression = match_expression(fts_terms)
+
+        # An explicit ?ordering= wins over relevance
+        if api_settings.ORDERING_PARAM in request.query_params:
+            return queryset.filter(
+                id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [expression])
+            )
+        # Join the search table so MATCH runs once and each row's rank comes
+        # with it (a correlated rank subquery re-runs MATCH for every row)
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f"{FTS_TABLE}.rowid = api_book.id", f"{FTS_TABLE} MATCH %s"],
+            params=[expression],
+            select={"search_rank": f"{FTS_TABLE}.rank"},
+        ).order_by("search_rank", "id")
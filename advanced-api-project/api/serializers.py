@@ -8,6 +8,13 @@ class BookSerializer(serializers.ModelSerializer):
         model = Book
         fields = "__all__"  # serialize all fields
 
+    # Optional `fields` argument keeps only the named fields (used for ?fields=)
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
     # Custom validation: ensure publication_year is not in the future
     def validate_publication_year(self, value):
         current_year = datetime.date.today().year
@@ -15,11 +22,38 @@ class BookSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Publication year cannot be in the future.")
         return value
 
+# Author field that resolves ids from authors preloaded into the context
+# (context["authors"] = {pk: Author}), so bulk validation does not query per item
+class PreloadedAuthorField(serializers.PrimaryKeyRelatedField):
+    def to_internal_value(self, data):
+        authors = self.context.get("authors")
+        if authors is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if pk not in authors:
+            self.fail("does_not_exist", pk_value=data)
+        return authors[pk]
+
+
+# Book serializer used by the bulk endpoints: same fields and validation as
+# BookSerializer, with authors looked up from the preloaded context
+class BookBulkSerializer(BookSerializer):
+    author = PreloadedAuthorField(queryset=Author.objects.all())
+
+
 # Serializer for the Author model
 class AuthorSerializer(serializers.ModelSerializer):
     # Nested serializer: include books written by the author
+    # (views should prefetch "books" so this does not query per author)
     books = BookSerializer(many=True, read_only=True)
+    # Total number of books; the denormalized Author.book_count column
+    book_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Author
-        fields = ["id", "name", "books"]
+        fields = ["id", "name", "book_count", "books"]
@@ -0,0 +1,68 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import facets, search
+from .cache import bump_catalog_version
+from .models import Author, Book
+
+
+# Keep the full-text search table in sync with Book/Author writes.
+# bulk_create() and queryset.update() skip these; run
+# `python manage.py rebuild_book_search` (and rebuild_book_facets) after bulk loads.
+
+@receiver(post_save, sender=Book)
+def index_book(sender, instance, **kwargs):
+    search.index_book(instance)
+
+
+@receiver(post_delete, sender=Book)
+def unindex_book(sender, instance, **kwargs):
+    search.unindex_book(instance.pk)
+
+
+@receiver(post_save, sender=Author)
+def index_author(sender, instance, created, **kwargs):
+    # A new author has no books yet
+    if not created:
+        search.index_author(instance)
+
+
+# Keep the BookFacet counts in step with Book writes (see api/facets.py).
+# An update moves the book from its old buckets to the new ones, so the old
+# values are read before the save.
+
+@receiver(pre_save, sender=Book)
+def remember_facet_values(sender, instance, update_fields=None, **kwargs):
+    instance._facet_values = None
+    if instance.pk is None:
+        return
+    if update_fields is not None and not {"publication_year", "author", "author_id"} & set(update_fields):
+        return
+    instance._facet_values = (
+        Book.objects.filter(pk=instance.pk).values(*facets.FACET_FIELDS.values()).first()
+    )
+
+
+@receiver(post_save, sender=Book)
+def count_saved_book(sender, instance, created, **kwargs):
+    old = getattr(instance, "_facet_values", None)
+    if not created and old is None:
+        return
+    changes = facets.book_changes(facets.facet_values(instance))
+    if old is not None:
+        changes.subtract(facets.book_changes(facets.facet_values(old)))
+    facets.apply_changes(changes)
+
+
+@receiver(post_delete, sender=Book)
+def uncount_deleted_book(sender, instance, **kwargs):
+    facets.apply_changes(facets.book_changes(facets.facet_values(instance), sign=-1))
+
+
+# Any catalog write invalidates the cached book list responses (see api/cache.py)
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+def invalidate_catalog_cache(sender, **kwargs):
+    bump_catalog_version()
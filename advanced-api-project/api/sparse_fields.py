@@ -0,0 +1,44 @@
+from rest_framework.exceptions import ValidationError
+
+# Sparse fieldsets: ?fields=id,title narrows both the serialized output and the
+# columns selected from the database (QuerySet.only()).
+
+
+class SparseFieldsMixin:
+    """
+    For views whose serializer accepts a `fields` argument (see BookSerializer).
+    - Unknown names in ?fields= are a 400 error
+    - `required_columns` are always loaded even when not serialized
+      (e.g. updated_at, which the ETag validators read)
+    """
+    fields_query_param = "fields"
+    required_columns = []
+
+    def get_requested_fields(self):
+        if not hasattr(self, "_requested_fields"):
+            self._requested_fields = None
+            value = self.request.query_params.get(self.fields_query_param)
+            if value:
+                requested = [name.strip() for name in value.split(",") if name.strip()]
+                available = self.get_serializer_class()().fields
+                unknown = [name for name in requested if name not in available]
+                if unknown:
+                    raise ValidationError(
+                        {self.fields_query_param: [f"Unknown field(s): {', '.join(unknown)}"]}
+                    )
+                self._requested_fields = requested
+        return self._requested_fields
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_requested_fields()
+        if fields is None:
+            return queryset
+        columns = dict.fromkeys(fields + self.required_columns)
+        return queryset.only(*columns)
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_requested_fields()
+        if fields is not None:
+            kwargs["fields"] = fields
+        return super().get_serializer(*args, **kwargs)
@@ -1,8 +1,38 @@
+import base64
+import csv
+import gzip
+import io
+import json
+import os
+import sqlite3
+import tempfile
+from contextlib import closing
+from unittest import mock, skipUnless
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.http import HttpResponse
 from django.urls import reverse
+from django.utils.http import http_date
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase
 from django.contrib.auth.models import User
-from .models import Author, Book
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.views import APIView
+from advanced_api_project.middleware import COMPRESSORS, brotli, choose_encoding, zstandard
+from advanced_api_project.routers import PrimaryReplicaRouter, ReplicaRoutingMiddleware
+from advanced_api_project.sqlite import apply_pragmas, get_pragmas, pragma_statements
+from . import facets
+from .cache import CATALOG_VERSION_KEY, CatalogCacheMixin, bump_catalog_version
+from .management.commands.sync_replicas import Command as SyncReplicasCommand
+from .models import Author, Book, BookFacet
+from .renderers import msgpack
+from .serializers import BookSerializer
+from .views import BookBulkView
 
 
 class BookAPITestCase(APITestCase):
@@ -101,3 +131,1205 @@ class BookAPITestCase(APITestCase):
         response = self.client.get(self.list_url, {"ordering": "-publication_year"})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data[0]["title"], "Second Book")
+
+
+class BookCursorPaginationTestCase(APITestCase):
+    """
+    Tests for the opt-in keyset pagination on the book list.
+    """
+
+    def setUp(self):
+        self.author = Author.objects.create(name="Paged Author")
+        # Several books share a publication_year so the id tiebreaker is exercised
+        for i in range(7):
+            Book.objects.create(
+                title=f"Book {i}", publication_year=2000 + i % 3, author=self.author
+            )
+        self.list_url = reverse("book-list")
+
+    def walk(self, params):
+        """Follow next links until the end and return all titles seen."""
+        titles = []
+        response = self.client.get(self.list_url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            titles.extend(book["title"] for book in response.data["results"])
+            if not response.data["next"]:
+                return titles
+            response = self.client.get(response.data["next"])
+
+    def test_unpaginated_by_default(self):
+        response = self.client.get(self.list_url)
+        self.assertEqual(len(response.data), 7)
+
+    def test_pages_by_title(self):
+        titles = self.walk({"page_size": 3})
+        self.assertEqual(titles, [f"Book {i}" for i in range(7)])
+
+    def test_pages_by_year_desc_with_ties(self):
+        titles = self.walk({"page_size": 2, "ordering": "-publication_year"})
+        expected = [
+            b.title for b in Book.objects.order_by("-publication_year", "-id")
+        ]
+        self.assertEqual(titles, expected)
+
+    def test_previous_link(self):
+        first = self.client.get(self.list_url, {"page_size": 3})
+        self.assertIsNone(first.data["previous"])
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+        self.assertEqual(back.data["results"], first.data["results"])
+
+    def test_works_with_filters(self):
+        titles = self.walk({"page_size": 1, "publication_year": 2001})
+        self.assertEqual(titles, ["Book 1", "Book 4"])
+
+    def test_no_count_query(self):
+        with self.assertNumQueries(1) as ctx:
+            self.client.get(self.list_url, {"page_size": 3})
+        sql = ctx.captured_queries[0]["sql"].upper()
+        self.assertNotIn("COUNT(", sql)
+        self.assertNotIn("OFFSET", sql)
+
+    def test_cursor_from_other_ordering_rejected(self):
+        first = self.client.get(self.list_url, {"page_size": 3})
+        cursor = first.data["next"].split("cursor=")[1].split("&")[0]
+        response = self.client.get(
+            self.list_url, {"cursor": cursor, "ordering": "publication_year"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_garbage_cursor_rejected(self):
+        response = self.client.get(self.list_url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        def encode(data):
+            return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+        for cursor in [
+            {"o": "title", "v": "a", "i": "zz", "r": False},
+            {"o": "title", "v": {"a": 1}, "i": 1, "r": False},
+            {"o": "title", "v": ["a"], "i": 1, "r": False},
+            {"o": "title", "v": 5, "i": 1, "r": False},
+            {"o": "title", "v": "a", "i": True, "r": False},
+            {"o": "title", "v": "a", "i": 1, "r": "yes"},
+            {"o": "publication_year", "v": "1990", "i": 1, "r": False},
+            ["title", "a", 1, False],
+        ]:
+            with self.subTest(cursor=cursor):
+                params = {"cursor": encode(cursor)}
+                if isinstance(cursor, dict) and cursor["o"] != "title":
+                    params["ordering"] = cursor["o"]
+                response = self.client.get(self.list_url, params)
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class BookQueryPlanTestCase(APITestCase):
+    """
+    Checks that every filter/ordering combination BookListView exposes is
+    answered from an index instead of a full table scan plus sort.
+    """
+
+    def setUp(self):
+        author = Author.objects.create(name="Planner")
+        Book.objects.bulk_create(
+            Book(title=f"Book {i}", publication_year=1900 + i % 100, author=author)
+            for i in range(200)
+        )
+        self.author = author
+        self.list_url = reverse("book-list")
+
+    def query_plan(self, params):
+        """Run the list view and return the EXPLAIN QUERY PLAN of its SELECT."""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.list_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        sql = ctx.captured_queries[-1]["sql"]
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + sql)
+            return " | ".join(row[-1] for row in cursor.fetchall())
+
+    def test_indexes_used(self):
+        cases = [
+            ({"ordering": "title"}, "book_title_idx"),
+            ({"ordering": "publication_year"}, "book_year_idx"),
+            ({"publication_year": 1950, "ordering": "title"}, "book_year_title_idx"),
+            ({"author": self.author.id, "ordering": "title"}, "book_author_title_idx"),
+            (
+                {"author": self.author.id, "ordering": "-publication_year"},
+                "book_author_year_idx",
+            ),
+            ({"title": "Book 7"}, "book_title_idx"),
+            ({"page_size": 10, "ordering": "-publication_year"}, "book_year_idx"),
+        ]
+        for params, index in cases:
+            with self.subTest(params=params):
+                plan = self.query_plan(params)
+                self.assertIn(index, plan)
+                self.assertNotIn("TEMP B-TREE", plan)
+
+
+class BookFullTextSearchTestCase(APITestCase):
+    """
+    Tests for the FTS5-backed ?search= on the book list.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="searcher", password="testpass123")
+        self.achebe = Author.objects.create(name="Chinua Achebe")
+        self.other = Author.objects.create(name="Someone Else")
+        self.fall = Book.objects.create(
+            title="Things Fall Apart", publication_year=1958, author=self.achebe
+        )
+        self.arrow = Book.objects.create(
+            title="Arrow of God", publication_year=1964, author=self.achebe
+        )
+        self.falling = Book.objects.create(
+            title="Falling Fall Fallen", publication_year=2001, author=self.other
+        )
+        self.list_url = reverse("book-list")
+
+    def search(self, term, **params):
+        response = self.client.get(self.list_url, {"search": term, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [book["title"] for book in response.data]
+
+    def test_substring_match_like_icontains(self):
+        self.assertEqual(sorted(self.search("all")), ["Falling Fall Fallen", "Things Fall Apart"])
+        self.assertEqual(self.search("ROW OF"), ["Arrow of God"])
+
+    def test_matches_author_name(self):
+        self.assertEqual(sorted(self.search("achebe")), ["Arrow of God", "Things Fall Apart"])
+
+    def test_short_terms_fall_back(self):
+        self.assertEqual(self.search("of"), ["Arrow of God"])
+
+    def test_ranked_unless_ordering_given(self):
+        self.assertEqual(self.search("fall"), ["Falling Fall Fallen", "Things Fall Apart"])
+        self.assertEqual(
+            self.search("fall", ordering="title"), ["Falling Fall Fallen", "Things Fall Apart"]
+        )
+        self.assertEqual(
+            self.search("fall", ordering="publication_year"),
+            ["Things Fall Apart", "Falling Fall Fallen"],
+        )
+
+    def test_ranked_search_matches_once(self):
+        # MATCH per row (a correlated rank subquery) takes minutes on 100k books
+        with CaptureQueriesContext(connection) as ctx:
+            self.search("fall")
+        matches = [query["sql"].count("MATCH") for query in ctx.captured_queries]
+        self.assertEqual(max(matches), 1)
+
+    def test_quotes_in_terms_are_literal(self):
+        self.assertEqual(self.search('"AND" OR'), [])
+
+    def test_index_follows_writes(self):
+        self.client.login(username="searcher", password="testpass123")
+        self.client.put(
+            reverse("book-update", args=[self.arrow.id]),
+            {"title": "No Longer at Ease", "publication_year": 1960, "author": self.achebe.id},
+        )
+        self.assertEqual(self.search("arrow"), [])
+        self.assertEqual(self.search("longer"), ["No Longer at Ease"])
+
+        self.achebe.name = "C. Achebe"
+        self.achebe.save()
+        self.assertEqual(len(self.search("c. ache")), 2)
+
+        self.client.delete(reverse("book-delete", args=[self.fall.id]))
+        self.assertEqual(self.search("things"), [])
+
+
+class AuthorAPITestCase(APITestCase):
+    """
+    Tests for the author endpoints: nested books, book_count and query counts.
+    """
+
+    def create_authors(self, count, books_each):
+        for i in range(count):
+            author = Author.objects.create(name=f"Author {i}")
+            books = Book.objects.bulk_create(
+                Book(title=f"Book {i}-{j:02d}", publication_year=2000, author=author)
+                for j in range(books_each)
+            )
+            # bulk_create() skips the signals that maintain Author.book_count
+            facets.count_books(books)
+
+    def test_list_includes_count_and_bounded_books(self):
+        self.create_authors(2, 15)
+        response = self.client.get(reverse("author-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first = response.data["results"][0]
+        self.assertEqual(first["book_count"], 15)
+        self.assertEqual(len(first["books"]), 10)
+        self.assertEqual(first["books"][0]["title"], "Book 0-00")
+
+    def test_detail(self):
+        self.create_authors(1, 3)
+        author = Author.objects.get()
+        response = self.client.get(reverse("author-detail", args=[author.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["book_count"], 3)
+        self.assertEqual(len(response.data["books"]), 3)
+
+    def test_author_without_books(self):
+        Author.objects.create(name="Unpublished")
+        response = self.client.get(reverse("author-list"))
+        self.assertEqual(response.data["results"][0]["book_count"], 0)
+        self.assertEqual(response.data["results"][0]["books"], [])
+
+    def test_list_query_count_is_constant(self):
+        # One query for the authors page, one for their prefetched books
+        self.create_authors(3, 2)
+        with self.assertNumQueries(2):
+            self.client.get(reverse("author-list"))
+
+        self.create_authors(20, 12)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("author-list"))
+        self.assertEqual(len(response.data["results"]), 20)
+
+    def test_order_by_book_count(self):
+        self.create_authors(3, 0)
+        for author, books in zip(Author.objects.order_by("id"), [1, 3, 2]):
+            for j in range(books):
+                Book.objects.create(title=f"T{j}", publication_year=2000, author=author)
+        response = self.client.get(reverse("author-list"), {"ordering": "-book_count"})
+        self.assertEqual(
+            [author["book_count"] for author in response.data["results"]], [3, 2, 1]
+        )
+
+    def test_book_count_follows_writes(self):
+        ann = Author.objects.create(name="Ann")
+        bob = Author.objects.create(name="Bob")
+        user = User.objects.create_user(username="counter", password="pass")
+        self.client.force_authenticate(user)
+
+        response = self.client.post(
+            reverse("book-create"), {"title": "A", "publication_year": 2000, "author": ann.id}
+        )
+        book_id = response.data["id"]
+        Book.objects.create(title="B", publication_year=2000, author=ann)
+        ann.refresh_from_db()
+        self.assertEqual(ann.book_count, 2)
+
+        # Reassigning moves the book from one count to the other
+        self.client.patch(reverse("book-update", args=[book_id]), {"author": bob.id})
+        ann.refresh_from_db()
+        bob.refresh_from_db()
+        self.assertEqual((ann.book_count, bob.book_count), (1, 1))
+
+        self.client.delete(reverse("book-delete", args=[book_id]))
+        bob.refresh_from_db()
+        self.assertEqual(bob.book_count, 0)
+
+        self.client.post(reverse("book-bulk"), [
+            {"title": "C", "publication_year": 2000, "author": bob.id},
+            {"title": "D", "publication_year": 2000, "author": ann.id},
+        ], format="json")
+        self.assertEqual(
+            dict(Author.objects.values_list("name", "book_count")), {"Ann": 2, "Bob": 1}
+        )
+
+    def test_repair_command(self):
+        self.create_authors(2, 3)
+        Author.objects.update(book_count=99)
+        out = io.StringIO()
+        call_command("repair_author_book_counts", stdout=out)
+        self.assertIn("2", out.getvalue())
+        self.assertEqual(set(Author.objects.values_list("book_count", flat=True)), {3})
+
+
+class BookListCacheTestCase(APITestCase):
+    """
+    Tests for the versioned book list response cache.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="cacher", password="testpass123")
+        self.author = Author.objects.create(name="Cached Author")
+        self.book = Book.objects.create(
+            title="Cached Book", publication_year=1999, author=self.author
+        )
+        self.list_url = reverse("book-list")
+
+    def test_repeated_read_skips_database(self):
+        first = self.client.get(self.list_url, {"ordering": "title"})
+        with self.assertNumQueries(0):
+            second = self.client.get(self.list_url, {"ordering": "title"})
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["Content-Type"], first["Content-Type"])
+
+    def test_query_string_is_normalized(self):
+        self.client.get(self.list_url + "?ordering=title&publication_year=1999")
+        response = self.client.get(self.list_url + "?publication_year=1999&ordering=title")
+        self.assertEqual(response["X-Cache"], "HIT")
+
+    def test_different_params_are_cached_separately(self):
+        self.client.get(self.list_url, {"publication_year": 1999})
+        response = self.client.get(self.list_url, {"publication_year": 2000})
+        self.assertFalse(response.has_header("X-Cache"))
+        self.assertEqual(response.json(), [])
+
+    def test_writes_invalidate(self):
+        self.client.get(self.list_url)
+        self.client.login(username="cacher", password="testpass123")
+        data = {"title": "Fresh Book", "publication_year": 2001, "author": self.author.id}
+        self.client.post(reverse("book-create"), data)
+        titles = [book["title"] for book in self.client.get(self.list_url).json()]
+        self.assertEqual(titles, ["Cached Book", "Fresh Book"])
+
+        self.client.delete(reverse("book-delete", args=[self.book.id]))
+        titles = [book["title"] for book in self.client.get(self.list_url).json()]
+        self.assertEqual(titles, ["Fresh Book"])
+
+    def test_author_change_invalidates(self):
+        self.client.get(self.list_url, {"search": "renamed"})
+        self.author.name = "Renamed Author"
+        self.author.save()
+        response = self.client.get(self.list_url, {"search": "renamed"})
+        self.assertEqual(len(response.json()), 1)
+
+    def test_bump_after_eviction_invalidates(self):
+        self.client.get(self.list_url)
+        cache.delete(CATALOG_VERSION_KEY)  # evicted
+        bump_catalog_version()
+        response = self.client.get(self.list_url)
+        self.assertFalse(response.has_header("X-Cache"))
+
+
+class BookConditionalGetTestCase(APITestCase):
+    """
+    Tests for ETag / Last-Modified support on book list and detail.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="poller", password="testpass123")
+        self.author = Author.objects.create(name="Polled Author")
+        self.book = Book.objects.create(
+            title="Polled Book", publication_year=2010, author=self.author
+        )
+        self.list_url = reverse("book-list")
+        self.detail_url = reverse("book-detail", args=[self.book.id])
+
+    def test_detail_not_modified(self):
+        first = self.client.get(self.detail_url)
+        self.assertTrue(first.has_header("ETag"))
+        self.assertTrue(first.has_header("Last-Modified"))
+        second = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(second.content, b"")
+
+    def test_detail_etag_changes_on_update(self):
+        first = self.client.get(self.detail_url)
+        self.book.title = "Renamed Book"
+        self.book.save()
+        second = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(second["ETag"], first["ETag"])
+
+    def test_detail_etag_depends_on_fields(self):
+        full = self.client.get(self.detail_url)
+        sparse = self.client.get(self.detail_url, {"fields": "title"}, HTTP_IF_NONE_MATCH=full["ETag"])
+        self.assertEqual(sparse.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(sparse["ETag"], full["ETag"])
+        # Same set in another order is the same representation
+        reordered = self.client.get(self.detail_url, {"fields": "title,id"})
+        self.assertEqual(reordered["ETag"], self.client.get(self.detail_url, {"fields": "id,title"})["ETag"])
+
+    def test_list_not_modified_without_serializing(self):
+        first = self.client.get(self.list_url, {"ordering": "title"})
+        etag = first["ETag"]
+        # Served from the response cache: no queries at all
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.list_url, {"ordering": "title"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_etag_depends_on_params(self):
+        first = self.client.get(self.list_url)
+        second = self.client.get(self.list_url, {"publication_year": 2010})
+        self.assertNotEqual(first["ETag"], second["ETag"])
+
+    def test_list_etag_changes_on_write(self):
+        first = self.client.get(self.list_url)
+        self.client.login(username="poller", password="testpass123")
+        self.client.delete(reverse("book-delete", args=[self.book.id]))
+        self.client.logout()
+        second = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.json(), [])
+
+    def test_list_has_no_last_modified(self):
+        # Deletes don't move MAX(updated_at): If-Modified-Since alone must not get a 304
+        first = self.client.get(self.list_url, {"ordering": "title"})
+        self.assertFalse(first.has_header("Last-Modified"))
+        since = http_date(self.book.updated_at.timestamp() + 1)
+        self.book.delete()
+        for params in ({"ordering": "title"}, {"ordering": "title", "page_size": 5}):
+            response = self.client.get(self.list_url, params, HTTP_IF_MODIFIED_SINCE=since)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertFalse(response.has_header("Last-Modified"))
+
+    def test_paginated_list_not_modified(self):
+        first = self.client.get(self.list_url, {"page_size": 5})
+        self.assertIn("results", first.json())
+        second = self.client.get(
+            self.list_url, {"page_size": 5, "ordering": "title"}, HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+        # Different query string, different representation
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        third = self.client.get(self.list_url, {"page_size": 5}, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(third.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class BookBulkAPITestCase(APITestCase):
+    """
+    Tests for the bulk create / update / delete endpoint.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="loader", password="testpass123")
+        self.client.login(username="loader", password="testpass123")
+        self.author = Author.objects.create(name="Bulk Author")
+        self.url = reverse("book-bulk")
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        response = self.client.post(self.url, [], format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_rejects_non_list(self):
+        response = self.client.post(self.url, {"title": "x"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_create_reports_item_errors(self):
+        data = [
+            {"title": f"Bulk {i}", "publication_year": 2000, "author": self.author.id}
+            for i in range(5)
+        ]
+        data.insert(2, {"title": "Future", "publication_year": 9999, "author": self.author.id})
+        data.append({"title": "Orphan", "publication_year": 2000, "author": 424242})
+        data.append("not an object")
+
+        # Authors + user session lookups, one INSERT, search index and savepoints;
+        # crucially not one query per item
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, data, format="json")
+        self.assertLess(len(ctx.captured_queries), 12)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 5)
+        self.assertEqual([e["index"] for e in response.data["errors"]], [2, 6, 7])
+        self.assertIn("publication_year", response.data["errors"][0]["errors"])
+        self.assertIn("author", response.data["errors"][1]["errors"])
+        self.assertEqual(Book.objects.count(), 5)
+
+        # New rows are searchable and the cached list is invalidated
+        search = self.client.get(reverse("book-list"), {"search": "Bulk 3"})
+        self.assertEqual([b["title"] for b in search.json()], ["Bulk 3"])
+
+    def test_bulk_create_batches(self):
+        data = [
+            {"title": f"Batch {i}", "publication_year": 2000, "author": self.author.id}
+            for i in range(25)
+        ]
+        with mock.patch.object(BookBulkView, "batch_size", 10):
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.post(self.url, data, format="json")
+        inserts = [q for q in ctx.captured_queries if q["sql"].startswith('INSERT INTO "api_book"')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(Book.objects.count(), 25)
+
+    def test_bulk_update(self):
+        books = Book.objects.bulk_create(
+            Book(title=f"Old {i}", publication_year=1990, author=self.author) for i in range(3)
+        )
+        before = {b.id: b.updated_at for b in Book.objects.all()}
+        data = [
+            {"id": books[0].id, "title": "New 0"},
+            {"id": books[1].id, "publication_year": 9999},
+            {"id": 424242, "title": "Missing"},
+        ]
+        response = self.client.patch(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["updated"], 1)
+        self.assertEqual([e["index"] for e in response.data["errors"]], [1, 2])
+
+        books[0].refresh_from_db()
+        self.assertEqual(books[0].title, "New 0")
+        self.assertGreater(books[0].updated_at, before[books[0].id])
+        books[1].refresh_from_db()
+        self.assertEqual(books[1].publication_year, 1990)
+
+    def test_bulk_update_rejects_duplicate_ids(self):
+        book = Book.objects.create(title="Twice", publication_year=1990, author=self.author)
+        data = [
+            {"id": book.id, "publication_year": 1980},
+            {"id": book.id, "publication_year": 1970},
+        ]
+        response = self.client.patch(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["updated"], 1)
+        self.assertEqual(response.data["errors"], [{"index": 1, "errors": {"id": ["Duplicate id."]}}])
+        book.refresh_from_db()
+        self.assertEqual(book.publication_year, 1980)
+        self.assertEqual(BookFacet.objects.get(value=1980).count, 1)
+        self.assertEqual(BookFacet.objects.get(value=1990).count, 0)
+        self.assertFalse(BookFacet.objects.filter(value=1970, count__gt=0).exists())
+
+    def test_bulk_put_requires_all_fields(self):
+        book = Book.objects.create(title="Whole", publication_year=1990, author=self.author)
+        response = self.client.put(self.url, [{"id": book.id, "title": "Half"}], format="json")
+        self.assertEqual(response.data["updated"], 0)
+        self.assertIn("publication_year", response.data["errors"][0]["errors"])
+
+    def test_bulk_delete(self):
+        books = Book.objects.bulk_create(
+            Book(title=f"Gone {i}", publication_year=1990, author=self.author) for i in range(3)
+        )
+        data = [books[0].id, books[2].id, 424242, "x"]
+        response = self.client.delete(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["deleted"], 2)
+        self.assertEqual([e["index"] for e in response.data["errors"]], [2, 3])
+        self.assertEqual(list(Book.objects.values_list("id", flat=True)), [books[1].id])
+
+    def test_bulk_delete_writes_to_primary(self):
+        book = Book.objects.create(title="Routed", publication_year=1990, author=self.author)
+
+        def db_for_read(model, **hints):
+            return "replica" if model is Book else "default"
+
+        # Even if Book reads were routed to a replica, the DELETE goes to the write alias
+        with mock.patch.object(PrimaryReplicaRouter, "db_for_read", side_effect=db_for_read):
+            response = self.client.delete(self.url, [book.id], format="json")
+        self.assertEqual(response.data["deleted"], 1)
+        self.assertFalse(Book.objects.filter(id=book.id).exists())
+
+    def test_bulk_delete_updates_index_and_counts_once(self):
+        def delete_books(count):
+            data = [
+                {"title": f"Doomed {i}", "publication_year": 1990, "author": self.author.id}
+                for i in range(count)
+            ]
+            ids = self.client.post(self.url, data, format="json").data["ids"]
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.delete(self.url, ids, format="json")
+            self.assertEqual(response.data["deleted"], count)
+            return len(ctx.captured_queries)
+
+        # Not one unindex / count update / cache bump per book
+        self.assertEqual(delete_books(2), delete_books(20))
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.book_count, 0)
+        self.assertEqual(BookFacet.objects.get(value=1990).count, 0)
+        response = self.client.get(reverse("book-list"), {"search": "doomed"})
+        self.assertEqual(response.json(), [])
+
+
+class BookExportTestCase(APITestCase):
+    """
+    Tests for the streaming NDJSON / CSV export.
+    """
+
+    def setUp(self):
+        self.author = Author.objects.create(name="Exported, Author")
+        Book.objects.create(title="Zebra", publication_year=2001, author=self.author)
+        Book.objects.create(title="Apple", publication_year=1999, author=self.author)
+
+    def export(self, export_format, **params):
+        response = self.client.get(reverse("book-export", args=[export_format]), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode("utf-8")
+
+    def test_ndjson(self):
+        response, body = self.export("ndjson")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row["title"] for row in rows], ["Apple", "Zebra"])
+        self.assertEqual(rows[0]["author_name"], "Exported, Author")
+        self.assertEqual(rows[0]["author"], self.author.id)
+
+    def test_csv(self):
+        response, body = self.export("csv", ordering="-publication_year")
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.reader(io.StringIO(body)))
+        self.assertEqual(rows[0][:3], ["id", "title", "publication_year"])
+        self.assertEqual([row[1] for row in rows[1:]], ["Zebra", "Apple"])
+        self.assertEqual(rows[1][4], "Exported, Author")
+
+    def test_reuses_list_filters(self):
+        _, body = self.export("ndjson", publication_year=2001)
+        self.assertEqual(len(body.splitlines()), 1)
+        _, body = self.export("ndjson", search="apple")
+        self.assertEqual(json.loads(body)["title"], "Apple")
+
+    def test_ignores_accept_header(self):
+        response = self.client.get(reverse("book-export", args=["csv"]), HTTP_ACCEPT="text/csv")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_invalid_filter_fails_before_streaming(self):
+        response = self.client.get(reverse("book-export", args=["csv"]), {"author": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BookSparseFieldsTestCase(APITestCase):
+    """
+    Tests for ?fields= on the book list and detail.
+    """
+
+    def setUp(self):
+        self.author = Author.objects.create(name="Sparse Author")
+        self.book = Book.objects.create(title="Sparse", publication_year=2003, author=self.author)
+        Book.objects.create(title="Sparser", publication_year=2004, author=self.author)
+
+    def test_list_fields_and_projection(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("book-list"), {"fields": "id,title"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()[0], {"id": self.book.id, "title": "Sparse"})
+        select = ctx.captured_queries[-1]["sql"]
+        self.assertNotIn('"publication_year"', select.split("FROM")[0])
+
+    def test_detail_fields(self):
+        response = self.client.get(
+            reverse("book-detail", args=[self.book.id]), {"fields": "title,author"}
+        )
+        self.assertEqual(response.json(), {"title": "Sparse", "author": self.author.id})
+
+    def test_unknown_field_rejected(self):
+        response = self.client.get(reverse("book-list"), {"fields": "id,isbn"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("isbn", str(response.json()["fields"]))
+
+    def test_paginated_without_ordering_field(self):
+        # The cursor needs title even though only id was asked for
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("book-list"), {"fields": "id", "page_size": 1})
+        self.assertEqual(response.json()["results"], [{"id": self.book.id}])
+        self.assertIsNotNone(response.json()["next"])
+
+
+class BookFastSerializationTestCase(APITestCase):
+    """
+    The .values() JSON path must produce exactly what BookSerializer +
+    JSONRenderer would.
+    """
+
+    def setUp(self):
+        author = Author.objects.create(name="Ünïcode Author")
+        Book.objects.create(title="Line\u2028Separator\u2029", publication_year=1990, author=author)
+        Book.objects.create(title='Quotes "and" \\ slashes', publication_year=1991, author=author)
+        Book.objects.create(title="日本語のタイトル", publication_year=1992, author=author)
+        self.list_url = reverse("book-list")
+
+    def expected(self, queryset, **kwargs):
+        return JSONRenderer().render(BookSerializer(queryset, many=True, **kwargs).data)
+
+    def test_full_list_matches_serializer(self):
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.content, self.expected(Book.objects.order_by("title")))
+
+    def test_sparse_list_matches_serializer(self):
+        response = self.client.get(self.list_url, {"fields": "title,updated_at"})
+        self.assertEqual(
+            response.content,
+            self.expected(Book.objects.order_by("title"), fields=["title", "updated_at"]),
+        )
+
+    def test_paginated_results_match_serializer(self):
+        response = self.client.get(self.list_url, {"page_size": 2})
+        results = JSONRenderer().render(response.json()["results"])
+        self.assertEqual(results, self.expected(Book.objects.order_by("title", "id")[:2]))
+
+    def test_stdlib_fallback_matches(self):
+        with mock.patch("api.renderers.orjson", None):
+            response = self.client.get(self.list_url, {"ordering": "-publication_year"})
+        self.assertEqual(
+            response.content, self.expected(Book.objects.order_by("-publication_year"))
+        )
+
+    def test_browsable_api_uses_serializer(self):
+        response = self.client.get(self.list_url, HTTP_ACCEPT="text/html")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertContains(response, "Separator")
+
+
+class ServerTimingTestCase(APITestCase):
+    """
+    Tests for the Server-Timing middleware.
+    """
+
+    def setUp(self):
+        author = Author.objects.create(name="Timed Author")
+        self.book = Book.objects.create(title="Timed", publication_year=2000, author=author)
+
+    def metrics(self, response):
+        header = response["Server-Timing"]
+        return {part.split(";")[0].strip(): part for part in header.split(",")}
+
+    def test_list_header(self):
+        response = self.client.get(reverse("book-list"), {"ordering": "title"})
+        metrics = self.metrics(response)
+        self.assertEqual(set(metrics), {"db", "serialize", "render", "total"})
+        self.assertIn('desc="2 queries"', metrics["db"])
+
+    def test_detail_header(self):
+        response = self.client.get(reverse("book-detail", args=[self.book.id]))
+        metrics = self.metrics(response)
+        self.assertIn('desc="1 query"', metrics["db"])
+        self.assertIn("serialize", metrics)
+
+    def test_cache_hit_has_no_queries_or_render(self):
+        self.client.get(reverse("book-list"))
+        metrics = self.metrics(self.client.get(reverse("book-list")))
+        self.assertEqual(set(metrics), {"db", "total"})
+        self.assertIn('desc="0 queries"', metrics["db"])
+
+    def test_structured_log_line(self):
+        with self.assertLogs("server_timing", level="INFO") as logs:
+            self.client.get(reverse("book-detail", args=[self.book.id]))
+        record = logs.records[0]
+        self.assertEqual(record.status, 200)
+        self.assertEqual(record.queries, 1)
+        self.assertIn("path=/api/books/", record.getMessage())
+
+
+class AsyncBookViewsTestCase(APITestCase):
+    """
+    The async views must answer exactly like the sync ones.
+    """
+
+    def setUp(self):
+        self.author = Author.objects.create(name="Async Author")
+        other = Author.objects.create(name="Other Writer")
+        for i, year in enumerate([1990, 2005, 2005, 2020]):
+            Book.objects.create(title=f"Async Book {i}", publication_year=year, author=self.author)
+        self.book = Book.objects.create(title="Lonely", publication_year=1999, author=other)
+
+    async def assert_same_as_sync(self, sync_name, async_name, params=None, args=None):
+        sync_response = await sync_to_async(self.client.get)(reverse(sync_name, args=args), params)
+        async_response = await self.async_client.get(reverse(async_name, args=args), params)
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        # Pagination links point at each view's own URL
+        content = async_response.content.replace(b"/api/async/books/", b"/api/books/")
+        self.assertEqual(content, sync_response.content)
+        self.assertEqual(async_response.get("ETag"), sync_response.get("ETag"))
+        return async_response
+
+    async def test_list_matches_sync(self):
+        for params in [
+            {},
+            {"author": self.author.id},
+            {"publication_year": 2005},
+            {"search": "async"},
+            {"ordering": "-publication_year"},
+            {"fields": "id,title"},
+            {"page_size": 2, "ordering": "-publication_year"},
+        ]:
+            with self.subTest(params=params):
+                await self.assert_same_as_sync("book-list", "async-book-list", params)
+
+    async def test_cursor_pages_match_sync(self):
+        response = await self.assert_same_as_sync("book-list", "async-book-list", {"page_size": 2})
+        cursor = response.json()["next"].split("cursor=")[1].split("&")[0]
+        await self.assert_same_as_sync(
+            "book-list", "async-book-list", {"page_size": 2, "cursor": cursor}
+        )
+
+    async def test_detail_matches_sync(self):
+        await self.assert_same_as_sync("book-detail", "async-book-detail", args=[self.book.id])
+        await self.assert_same_as_sync(
+            "book-detail", "async-book-detail", {"fields": "title"}, args=[self.book.id]
+        )
+
+    async def test_errors_match_sync(self):
+        await self.assert_same_as_sync("book-detail", "async-book-detail", args=[999999])
+        await self.assert_same_as_sync("book-list", "async-book-list", {"author": 999999})
+        await self.assert_same_as_sync("book-list", "async-book-list", {"fields": "nope"})
+        await self.assert_same_as_sync("book-list", "async-book-list", {"cursor": "garbage"})
+
+    async def test_not_modified(self):
+        url = reverse("async-book-detail", args=[self.book.id])
+        etag = (await self.async_client.get(url))["ETag"]
+        response = await self.async_client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = await self.async_client.get(url, {"fields": "title"}, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    async def test_read_only(self):
+        response = await self.async_client.post(reverse("async-book-list"), {})
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    async def test_server_timing_counts_queries(self):
+        response = await self.async_client.get(reverse("async-book-detail", args=[self.book.id]))
+        self.assertIn('db;dur=', response["Server-Timing"])
+        self.assertIn('desc="1 query"', response["Server-Timing"])
+
+
+class BookFacetsTestCase(APITestCase):
+    """
+    Tests for the facet counts endpoint and the BookFacet table behind it.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="facets", password="pass")
+        self.ann = Author.objects.create(name="Ann")
+        self.bob = Author.objects.create(name="Bob")
+        Book.objects.create(title="River Song", publication_year=1990, author=self.ann)
+        Book.objects.create(title="Stone Song", publication_year=1990, author=self.bob)
+        self.book = Book.objects.create(title="River Town", publication_year=2000, author=self.ann)
+        self.url = reverse("book-facets")
+
+    def expected(self, queryset=None):
+        queryset = Book.objects.all() if queryset is None else queryset
+        return {
+            "publication_year": facets.count_queryset(queryset, "publication_year"),
+            "author": facets.count_queryset(queryset, "author"),
+        }
+
+    def assert_table_matches(self):
+        stored = {
+            facet: [{key: bucket[key] for key in ("value", "count")} for bucket in facets.get_facet(facet)]
+            for facet in facets.FACET_FIELDS
+        }
+        expected = {
+            facet: [{key: bucket[key] for key in ("value", "count")} for bucket in buckets]
+            for facet, buckets in self.expected().items()
+        }
+        self.assertEqual(stored, expected)
+
+    def test_unfiltered_reads_table(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.json(), self.expected())
+        self.assertEqual(response.json()["author"][0], {"value": self.ann.id, "count": 2, "name": "Ann"})
+        self.assertFalse(any("api_book\"" in query["sql"] for query in ctx.captured_queries))
+
+    def test_filters_apply_to_other_facets(self):
+        response = self.client.get(self.url, {"author": self.ann.id})
+        data = response.json()
+        # The author facet ignores ?author=, the year facet honours it
+        self.assertEqual(data["author"], self.expected()["author"])
+        self.assertEqual(
+            data["publication_year"],
+            [{"value": 1990, "count": 1}, {"value": 2000, "count": 1}],
+        )
+
+    def test_search_applies_to_every_facet(self):
+        response = self.client.get(self.url, {"search": "river"})
+        self.assertEqual(response.json(), self.expected(Book.objects.filter(title__icontains="river")))
+
+    def test_invalid_filter(self):
+        response = self.client.get(self.url, {"publication_year": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_writes_keep_table_current(self):
+        self.book.publication_year = 2010
+        self.book.author = self.bob
+        self.book.save()
+        self.assert_table_matches()
+        self.book.title = "Renamed"
+        self.book.save(update_fields=["title"])
+        self.assert_table_matches()
+        self.ann.delete()
+        self.assert_table_matches()
+        Book.objects.create(title="New", publication_year=1990, author=self.bob)
+        self.assert_table_matches()
+
+    def test_bulk_endpoint_keeps_table_current(self):
+        self.client.force_authenticate(self.user)
+        bulk_url = reverse("book-bulk")
+        self.client.post(bulk_url, [
+            {"title": "Bulk A", "publication_year": 1980, "author": self.bob.id},
+            {"title": "Bulk B", "publication_year": 1990, "author": self.bob.id},
+        ], format="json")
+        self.assert_table_matches()
+        self.client.patch(bulk_url, [{"id": self.book.id, "publication_year": 1980}], format="json")
+        self.assert_table_matches()
+        self.client.delete(bulk_url, [self.book.id], format="json")
+        self.assert_table_matches()
+
+    def test_writes_without_upsert(self):
+        with mock.patch("api.facets.UPSERT_VENDORS", ()):
+            Book.objects.create(title="New", publication_year=1700, author=self.bob)
+            self.book.delete()
+        self.assert_table_matches()
+
+    def test_rebuild(self):
+        BookFacet.objects.all().delete()
+        facets.rebuild()
+        self.assert_table_matches()
+
+
+@skipUnless(msgpack, "msgpack is not installed")
+class MessagePackTestCase(APITestCase):
+    """
+    MessagePack is negotiated with Accept / Content-Type and carries the same data as JSON.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="packer", password="pass")
+        self.author = Author.objects.create(name="Packed Author")
+        self.book = Book.objects.create(title="Packed", publication_year=2001, author=self.author)
+
+    def get_both(self, url, params=None):
+        json_response = self.client.get(url, params)
+        packed = self.client.get(url, params, HTTP_ACCEPT="application/msgpack")
+        self.assertEqual(packed["Content-Type"], "application/msgpack")
+        self.assertEqual(msgpack.unpackb(packed.content), json_response.json())
+        return packed
+
+    def test_read_endpoints(self):
+        self.get_both(reverse("book-list"))
+        self.get_both(reverse("book-list"), {"page_size": 1, "fields": "id,title"})
+        self.get_both(reverse("book-detail", args=[self.book.id]))
+        self.get_both(reverse("author-list"))
+        self.get_both(reverse("book-facets"))
+
+    def test_format_query_param(self):
+        response = self.client.get(reverse("book-list"), {"format": "msgpack"})
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+
+    def test_cached_separately_from_json(self):
+        url = reverse("book-list")
+        self.client.get(url)
+        packed = self.client.get(url, HTTP_ACCEPT="application/msgpack")
+        self.assertEqual(packed["Content-Type"], "application/msgpack")
+        self.assertEqual(msgpack.unpackb(packed.content)[0]["title"], "Packed")
+        self.assertEqual(self.client.get(url, HTTP_ACCEPT="application/msgpack")["X-Cache"], "HIT")
+
+    def test_create_from_msgpack_body(self):
+        self.client.force_authenticate(self.user)
+        body = msgpack.packb({"title": "Binary", "publication_year": 1999, "author": self.author.id})
+        response = self.client.post(
+            reverse("book-create"), body, content_type="application/msgpack",
+            HTTP_ACCEPT="application/msgpack",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(msgpack.unpackb(response.content)["title"], "Binary")
+
+    def test_bulk_from_msgpack_body(self):
+        self.client.force_authenticate(self.user)
+        body = msgpack.packb([
+            {"title": f"Bulk {i}", "publication_year": 1999, "author": self.author.id} for i in range(3)
+        ])
+        response = self.client.post(reverse("book-bulk"), body, content_type="application/msgpack")
+        self.assertEqual(response.data["created"], 3)
+
+    def test_malformed_body(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            reverse("book-create"), b"\xc1", content_type="application/msgpack"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(COMPRESSION_MIN_SIZE=200)
+class CompressionTestCase(APITestCase):
+    """
+    Tests for CompressionMiddleware and the compressed bytes kept in the list cache.
+    """
+
+    def setUp(self):
+        author = Author.objects.create(name="Compressible Author")
+        Book.objects.bulk_create(
+            Book(title=f"Compressible title {i}", publication_year=2000, author=author)
+            for i in range(20)
+        )
+        self.url = reverse("book-list")
+
+    def test_gzip(self):
+        plain = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Vary"].count("Accept-Encoding"), 1)
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertTrue(response["ETag"].startswith('W/"'))
+
+    def test_small_and_unaccepted_responses_untouched(self):
+        small = self.client.get(self.url, {"fields": "id", "page_size": 1}, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(small.has_header("Content-Encoding"))
+        identity = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip;q=0, identity")
+        self.assertFalse(identity.has_header("Content-Encoding"))
+
+    def test_negotiation(self):
+        self.assertEqual(choose_encoding("gzip, br, zstd", ["zstd", "br", "gzip"]), "zstd")
+        self.assertEqual(choose_encoding("gzip;q=1, br;q=0.5", ["zstd", "br", "gzip"]), "gzip")
+        self.assertEqual(choose_encoding("*", ["br", "gzip"]), "br")
+        self.assertEqual(choose_encoding("br;q=0, *;q=0.1", ["br", "gzip"]), "gzip")
+        self.assertIsNone(choose_encoding("identity", ["br", "gzip"]))
+
+    def test_cache_hit_reuses_compressed_bytes(self):
+        self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+        with mock.patch.dict(COMPRESSORS, {"gzip": mock.Mock(side_effect=COMPRESSORS["gzip"])}):
+            first = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+            second = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+            self.assertFalse(COMPRESSORS["gzip"].called)
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.content, first.content)
+        self.assertIn("compress", second["Server-Timing"])
+
+    def test_other_encodings_stored_alongside(self):
+        fake = {"br": lambda data: b"br:" + data[:10]}
+        with mock.patch.dict(COMPRESSORS, fake), override_settings(COMPRESSION_ENCODINGS=["br", "gzip"]):
+            self.client.get(self.url)
+            brotli_response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="br")
+            gzip_response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(brotli_response["Content-Encoding"], "br")
+        self.assertTrue(brotli_response.content.startswith(b"br:"))
+        self.assertEqual(gzip_response["Content-Encoding"], "gzip")
+
+    def test_conditional_get_with_weak_etag(self):
+        etag = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")["ETag"]
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def assert_padded(self, encoding, decompress):
+        data = self.client.get(self.url).content
+        bodies = [COMPRESSORS[encoding](data) for _ in range(10)]
+        self.assertGreater(len({len(body) for body in bodies}), 1)
+        for body in bodies:
+            self.assertEqual(decompress(body), data)
+
+    def test_gzip_is_padded(self):
+        self.assert_padded("gzip", gzip.decompress)
+
+    @skipUnless(brotli, "brotli is not installed")
+    def test_brotli_is_padded(self):
+        self.assert_padded("br", brotli.decompress)
+
+    @skipUnless(zstandard, "zstandard is not installed")
+    def test_zstd_is_padded(self):
+        def decompress(body):
+            return zstandard.ZstdDecompressor().decompressobj(read_across_frames=True).decompress(body)
+        self.assert_padded("zstd", decompress)
+
+    def test_streaming_export_is_gzipped(self):
+        response = self.client.get(reverse("book-export", args=["csv"]), HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        content = gzip.decompress(b"".join(response.streaming_content)).decode()
+        self.assertIn("Compressible title 19", content)
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaRoutingTestCase(APITestCase):
+    """
+    Tests for PrimaryReplicaRouter and ReplicaRoutingMiddleware (routing
+    decisions only; the test database has no replica alias).
+    """
+
+    def route(self, method="get", cookies=None, write=False):
+        router = PrimaryReplicaRouter()
+        seen = {}
+
+        def view(request):
+            if write:
+                router.db_for_write(Book)
+            seen["read"] = router.db_for_read(Book)
+            return HttpResponse()
+
+        request = getattr(RequestFactory(), method)("/api/books/")
+        request.COOKIES.update(cookies or {})
+        response = ReplicaRoutingMiddleware(view)(request)
+        return seen["read"], response.cookies.get(ReplicaRoutingMiddleware.cookie_name)
+
+    def test_safe_reads_use_replica(self):
+        self.assertEqual(self.route(), ("replica", None))
+
+    def test_writes_use_primary_and_stick(self):
+        read, cookie = self.route("post")
+        self.assertEqual(read, "default")
+        self.assertEqual(cookie["max-age"], 5)
+
+    def test_sticky_cookie_reads_primary(self):
+        read, _ = self.route(cookies={ReplicaRoutingMiddleware.cookie_name: "1"})
+        self.assertEqual(read, "default")
+
+    def test_write_during_get_pins_primary(self):
+        read, cookie = self.route(write=True)
+        self.assertEqual(read, "default")
+        self.assertIsNotNone(cookie)
+
+    def test_outside_requests_use_primary(self):
+        self.assertEqual(PrimaryReplicaRouter().db_for_read(Book), "default")
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas_configured(self):
+        self.assertEqual(self.route(), ("default", None))
+
+    def test_replicas_not_migrated(self):
+        self.assertFalse(PrimaryReplicaRouter().allow_migrate("replica", "api"))
+        self.assertIsNone(PrimaryReplicaRouter().allow_migrate("default", "api"))
+
+    def test_cache_keys_differ_by_source(self):
+        keys = []
+
+        def view(request):
+            drf_request = APIView().initialize_request(request)
+            drf_request.accepted_renderer = JSONRenderer()
+            drf_request.accepted_media_type = "application/json"
+            keys.append(CatalogCacheMixin().get_cache_key(drf_request))
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(view)
+        middleware(RequestFactory().get("/api/books/"))
+        request = RequestFactory().get("/api/books/")
+        request.COOKIES[ReplicaRoutingMiddleware.cookie_name] = "1"
+        middleware(request)
+        self.assertIn(":replica:", keys[0])
+        self.assertIn(":primary:", keys[1])
+
+    def test_sync_replicas_copies_sqlite_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "primary.sqlite3")
+            target = os.path.join(directory, "replica.sqlite3")
+            with closing(sqlite3.connect(source)) as db, db:
+                db.execute("CREATE TABLE t (x)")
+                db.execute("INSERT INTO t VALUES (42)")
+            SyncReplicasCommand().copy_database(source, target)
+            with closing(sqlite3.connect(target)) as db:
+                self.assertEqual(db.execute("SELECT x FROM t").fetchall(), [(42,)])
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_sync_replicas_needs_replicas(self):
+        with self.assertRaises(CommandError):
+            call_command("sync_replicas")
+
+
+class SQLitePragmaTestCase(APITestCase):
+    """
+    Tests for the SQLite PRAGMA profile applied to new connections.
+    """
+
+    def pragma(self, db, name):
+        return db.execute(f"PRAGMA {name}").fetchone()[0]
+
+    def test_profile_applied_to_django_connections(self):
+        connection.ensure_connection()
+        db = connection.connection
+        self.assertEqual(self.pragma(db, "synchronous"), 1)  # NORMAL
+        self.assertEqual(self.pragma(db, "busy_timeout"), 5000)
+        self.assertEqual(self.pragma(db, "temp_store"), 2)  # MEMORY
+        self.assertEqual(self.pragma(db, "cache_size"), -20000)
+
+    def test_profile_keeps_file_journal_mode(self):
+        # journal_mode is stored in the file; the checked-in databases stay as they are
+        with tempfile.TemporaryDirectory() as directory:
+            with closing(sqlite3.connect(os.path.join(directory, "db.sqlite3"))) as db:
+                apply_pragmas(db.cursor(), get_pragmas())
+                self.assertEqual(self.pragma(db, "journal_mode"), "delete")
+
+    def test_rejects_unsafe_values(self):
+        with self.assertRaises(ValueError):
+            pragma_statements({"synchronous": "off; DROP TABLE api_book"})
+        with self.assertRaises(ValueError):
+            pragma_statements({"cache size": 10})
+
+    def test_benchmark_runs(self):
+        output = io.StringIO()
+        call_command("bench_sqlite", writers=[2], transactions=5, stdout=output)
+        self.assertIn("pragmas+immediate", output.getvalue())
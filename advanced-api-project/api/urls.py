@@ -1,13 +1,22 @@
-from django.urls import path
+from django.urls import path, re_path
+from .async_views import AsyncBookDetailView, AsyncBookListView
 from .views import (
-    BookListView, BookDetailView,
-    BookCreateView, BookUpdateView, BookDeleteView
+    BookListView, BookDetailView, BookFacetsView,
+    BookCreateView, BookUpdateView, BookDeleteView, BookBulkView, BookExportView,
+    AuthorListView, AuthorDetailView,
 )
 
 urlpatterns = [
     path("books/", BookListView.as_view(), name="book-list"),
     path("books/<int:pk>/", BookDetailView.as_view(), name="book-detail"),
     path("books/create/", BookCreateView.as_view(), name="book-create"),
+    path("books/bulk/", BookBulkView.as_view(), name="book-bulk"),
+    path("books/facets/", BookFacetsView.as_view(), name="book-facets"),
+    re_path(
+        r"^books/export\.(?P<export_format>ndjson|csv)$",
+        BookExportView.as_view(),
+        name="book-export",
+    ),
     
     
     path("books/<int:pk>/update/", BookUpdateView.as_view(), name="book-update"),
@@ -16,4 +25,11 @@ urlpatterns = [
     
     path("books/update/", BookUpdateView.as_view(), name="book-update-no-pk"),
     path("books/delete/", BookDeleteView.as_view(), name="book-delete-no-pk"),
+
+    # Async (ASGI) variants of the read endpoints
+    path("async/books/", AsyncBookListView.as_view(), name="async-book-list"),
+    path("async/books/<int:pk>/", AsyncBookDetailView.as_view(), name="async-book-detail"),
+
+    path("authors/", AuthorListView.as_view(), name="author-list"),
+    path("authors/<int:pk>/", AuthorDetailView.as_view(), name="author-detail"),
 ]
@@ -1,47 +1,179 @@
-from rest_framework import generics, filters
+import csv
+import json
+from collections import Counter
+
+from rest_framework import generics, filters, serializers, status
+from rest_framework.negotiation import BaseContentNegotiation
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 from django_filters import rest_framework   # ✅ included for checker
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Book
-from .serializers import BookSerializer
+from django_filters.utils import translate_validation
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Prefetch, Window
+from django.db.models.functions import RowNumber
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from . import facets, search
+from .cache import CatalogCacheMixin, bump_catalog_version
+from .conditional import ConditionalListMixin, ConditionalRetrieveMixin
+from .fast_serializers import ValuesListMixin
+from .models import Author, Book
+from .pagination import AuthorCursorPagination, BookCursorPagination
+from .search import BookFullTextSearchFilter
+from .serializers import AuthorSerializer, BookBulkSerializer, BookSerializer
+from .sparse_fields import SparseFieldsMixin
 
 
 # --- BOOK GENERIC VIEWS ---
 
+class BookFilterMixin:
+    """
+    Filtering, searching and ordering shared by every view that lists books.
+    """
+    # Enable filter/search/order
+    # (search runs last so relevance ordering can replace the default ordering)
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, BookFullTextSearchFilter]
+
+    # Fields available for filtering (?title=..., ?author=..., ?publication_year=...)
+    filterset_fields = ["title", "author", "publication_year"]
+
+    # Fields available for search (?search=keyword)
+    search_fields = ["title", "author__name"]
+
+    # Fields available for ordering (?ordering=title or ?ordering=-publication_year)
+    ordering_fields = ["title", "publication_year"]
+    ordering = ["title"]  # default ordering
+
+
 # 1. List all books with filtering, searching, and ordering
-class BookListView(generics.ListAPIView):
+class BookListView(
+    CatalogCacheMixin, ValuesListMixin, ConditionalListMixin, SparseFieldsMixin,
+    BookFilterMixin, generics.ListAPIView,
+):
     """
     Provides a read-only list of all Book instances.
     Supports:
     - Filtering by title, author, and publication_year
-    - Searching by title and author name
+    - Searching by title and author name (full-text index, ranked)
     - Ordering by title or publication_year
+    - Opt-in cursor pagination (?cursor= or ?page_size=)
+    - Response caching, invalidated by any Book/Author write
+    - ETag with 304 Not Modified
+    - Sparse fieldsets (?fields=id,title)
+    - JSON built from .values() rows instead of a serializer per row
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = BookCursorPagination
+    required_columns = ["updated_at"]
 
-    # Enable filter/search/order
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
 
-    # Fields available for filtering (?title=..., ?author=..., ?publication_year=...)
-    filterset_fields = ["title", "author", "publication_year"]
+class IgnoreClientContentNegotiation(BaseContentNegotiation):
+    """The export format comes from the URL, so ignore the Accept header."""
 
-    # Fields available for search (?search=keyword)
-    search_fields = ["title", "author__name"]
+    def select_parser(self, request, parsers):
+        return parsers[0]
 
-    # Fields available for ordering (?ordering=title or ?ordering=-publication_year)
-    ordering_fields = ["title", "publication_year"]
-    ordering = ["title"]  # default ordering
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+class Echo:
+    """File-like object whose write() returns the value, for streaming csv.writer output."""
+
+    def write(self, value):
+        return value
+
+
+class BookExportView(BookFilterMixin, generics.GenericAPIView):
+    """
+    Stream the (filtered) book catalog as NDJSON or CSV.
+    Accepts the same filter/search/ordering parameters as BookListView.
+    Rows are read in chunks with .iterator() and written as they arrive,
+    so memory use does not grow with the size of the table.
+    """
+    queryset = Book.objects.all()
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    content_negotiation_class = IgnoreClientContentNegotiation
+    export_fields = ["id", "title", "publication_year", "author", "author_name", "updated_at"]
+    chunk_size = 2000
+
+    def get_rows(self, queryset):
+        rows = queryset.values_list(
+            "id", "title", "publication_year", "author_id", "author__name", "updated_at"
+        )
+        for row in rows.iterator(chunk_size=self.chunk_size):
+            yield row[:-1] + (row[-1].isoformat().replace("+00:00", "Z"),)
+
+    def stream_ndjson(self, queryset):
+        for row in self.get_rows(queryset):
+            yield json.dumps(dict(zip(self.export_fields, row))) + "\n"
+
+    def stream_csv(self, queryset):
+        writer = csv.writer(Echo())
+        yield writer.writerow(self.export_fields)
+        for row in self.get_rows(queryset):
+            yield writer.writerow(row)
+
+    def get(self, request, export_format):
+        # Filter eagerly so invalid parameters fail before streaming starts
+        queryset = self.filter_queryset(self.get_queryset())
+        if export_format == "csv":
+            response = StreamingHttpResponse(self.stream_csv(queryset), content_type="text/csv")
+        else:
+            response = StreamingHttpResponse(
+                self.stream_ndjson(queryset), content_type="application/x-ndjson"
+            )
+        response["Content-Disposition"] = f'attachment; filename="books.{export_format}"'
+        return response
+
+
+class BookFacetsView(BookFilterMixin, generics.GenericAPIView):
+    """
+    Book counts per publication_year and per author, for the list's sidebar.
+    Accepts the same filter and search parameters as BookListView. A facet
+    ignores the filter on its own field (?author=3 still lists every author),
+    so when no other filter applies it is read from the stored counts in
+    O(number of buckets); otherwise it is grouped over the filtered books.
+    """
+    queryset = Book.objects.all()
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    facet_fields = ["publication_year", "author"]
+
+    def get_facet(self, facet):
+        params = self.request.query_params.copy()
+        params.pop(facet, None)
+        search_terms = params.get(api_settings.SEARCH_PARAM)
+        if not search_terms and not any(params.get(name) for name in self.filterset_fields):
+            return facets.get_facet(facet)
+
+        queryset = self.get_queryset()
+        filterset_class = DjangoFilterBackend().get_filterset_class(self, queryset)
+        filterset = filterset_class(data=params, queryset=queryset, request=self.request)
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        queryset = BookFullTextSearchFilter().filter_queryset(self.request, filterset.qs, self)
+        return facets.count_queryset(queryset, facet)
 
+    def get(self, request):
+        return Response({facet: self.get_facet(facet) for facet in self.facet_fields})
 
-class BookDetailView(generics.RetrieveAPIView):
+
+class BookDetailView(ConditionalRetrieveMixin, SparseFieldsMixin, generics.RetrieveAPIView):
     """
     Retrieve a single Book instance by its ID.
+    Supports ETag / Last-Modified with 304 Not Modified
+    and sparse fieldsets (?fields=id,title).
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    required_columns = ["updated_at"]
 
 
 class BookCreateView(generics.CreateAPIView):
@@ -72,3 +204,198 @@ class BookDeleteView(generics.DestroyAPIView):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticated]
+
+
+class BookBulkView(APIView):
+    """
+    Bulk create / update / delete books with a JSON array body.
+    - POST: list of book objects -> bulk_create
+    - PUT / PATCH: list of book objects with "id" -> bulk_update (PATCH is partial);
+      an id repeated later in the list is reported as an error
+    - DELETE: list of book ids
+    Every item is validated with BookSerializer rules in a single pass; valid
+    items are written in one transaction in batches of `batch_size`, invalid
+    ones are reported as {"index": ..., "errors": ...} without aborting the batch.
+    Restricted to authenticated users.
+    """
+    permission_classes = [IsAuthenticated]
+    batch_size = getattr(settings, "API_BULK_BATCH_SIZE", 500)
+    max_items = getattr(settings, "API_BULK_MAX_ITEMS", 50000)
+
+    def get_items(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            raise serializers.ValidationError({"detail": "Expected a list of items."})
+        if len(items) > self.max_items:
+            raise serializers.ValidationError(
+                {"detail": f"At most {self.max_items} items per request."}
+            )
+        return items
+
+    def get_serializer(self, items, partial=False):
+        # Load every referenced author with one query
+        author_ids = set()
+        for item in items:
+            try:
+                author_ids.add(int(item["author"]))
+            except (TypeError, ValueError, KeyError):
+                pass
+        context = {"request": self.request, "authors": Author.objects.in_bulk(author_ids)}
+        return BookBulkSerializer(context=context, partial=partial)
+
+    def validate_items(self, serializer, items):
+        """Return [(index, item, validated_data)] for valid items, and the per-item errors."""
+        errors = []
+        valid = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                errors.append({"index": index, "errors": {"detail": ["Expected an object."]}})
+                continue
+            try:
+                valid.append((index, item, serializer.run_validation(item)))
+            except serializers.ValidationError as exc:
+                errors.append({"index": index, "errors": exc.detail})
+        return valid, errors
+
+    def post(self, request):
+        items = self.get_items(request)
+        valid, errors = self.validate_items(self.get_serializer(items), items)
+
+        books = [Book(**data) for _, _, data in valid]
+        with transaction.atomic():
+            Book.objects.bulk_create(books, batch_size=self.batch_size)
+            search.index_books(books)
+            facets.count_books(books)
+            bump_catalog_version()
+
+        return Response(
+            {"created": len(books), "ids": [book.pk for book in books], "errors": errors},
+            status=status.HTTP_201_CREATED,
+        )
+
+    def put(self, request, partial=False):
+        items = self.get_items(request)
+        serializer = self.get_serializer(items, partial=partial)
+
+        ids = set()
+        for item in items:
+            if isinstance(item, dict) and isinstance(item.get("id"), int):
+                ids.add(item["id"])
+        existing = Book.objects.select_related("author").in_bulk(ids)
+
+        valid, errors = self.validate_items(serializer, items)
+        books = []
+        moved = Counter()  # facet buckets the books leave
+        fields = {"updated_at"}
+        seen = set()
+        for index, item, data in valid:
+            book = existing.get(item.get("id"))
+            if book is None:
+                errors.append({"index": index, "errors": {"id": ["Not found."]}})
+                continue
+            # A second change to the same book would be indexed and counted twice
+            if book.pk in seen:
+                errors.append({"index": index, "errors": {"id": ["Duplicate id."]}})
+                continue
+            seen.add(book.pk)
+            moved.update(facets.book_changes(facets.facet_values(book), sign=-1))
+            for name, value in data.items():
+                setattr(book, name, value)
+            # bulk_update() does not apply auto_now
+            book.updated_at = timezone.now()
+            fields.update(data)
+            books.append(book)
+        errors.sort(key=lambda error: error["index"])
+
+        with transaction.atomic():
+            Book.objects.bulk_update(books, sorted(fields), batch_size=self.batch_size)
+            search.index_books(books)
+            moved.update(facets.collect_changes(books))
+            facets.apply_changes(moved)
+            bump_catalog_version()
+
+        return Response({"updated": len(books), "errors": errors})
+
+    def patch(self, request):
+        return self.put(request, partial=True)
+
+    def delete(self, request):
+        items = self.get_items(request)
+        ids = []
+        errors = []
+        for index, item in enumerate(items):
+            if isinstance(item, int) and not isinstance(item, bool):
+                ids.append(item)
+            else:
+                errors.append({"index": index, "errors": {"id": ["A valid integer is required."]}})
+
+        deleted = []
+        with transaction.atomic():
+            for start in range(0, len(ids), self.batch_size):
+                locked = Book.objects.select_for_update().filter(
+                    id__in=ids[start:start + self.batch_size]
+                )
+                rows = list(locked.values("id", *facets.FACET_FIELDS.values()))
+                if not rows:
+                    continue
+                # One DELETE per batch without the per-book post_delete
+                # receivers; the index, counts and cache are updated once below
+                # (nothing cascades from Book). _raw_delete() is private Django
+                # API and takes the alias explicitly: the write database that
+                # select_for_update() picked, never Book.objects.db (the read router)
+                Book.objects.filter(id__in=[row["id"] for row in rows])._raw_delete(locked.db)
+                deleted.extend(rows)
+            search.unindex_books(row["id"] for row in deleted)
+            facets.count_books(deleted, sign=-1)
+            if deleted:
+                bump_catalog_version()
+
+        found = {row["id"] for row in deleted}
+        errors.extend(
+            {"index": index, "errors": {"id": ["Not found."]}}
+            for index, item in enumerate(items)
+            if isinstance(item, int) and not isinstance(item, bool) and item not in found
+        )
+        errors.sort(key=lambda error: error["index"])
+
+        return Response({"deleted": len(found), "errors": errors})
+
+
+# --- AUTHOR GENERIC VIEWS ---
+
+class AuthorQuerysetMixin:
+    """
+    Authors with their book count and at most `nested_books_limit` books.
+    Costs two queries however many authors are serialized: one for the
+    authors (book_count is a column) and one prefetch for the nested books.
+    """
+    nested_books_limit = 10
+
+    def get_queryset(self):
+        # ROW_NUMBER() per author keeps the prefetch to the first N books each
+        books = Book.objects.annotate(
+            row_number=Window(RowNumber(), partition_by=F("author"), order_by=["title", "id"])
+        ).filter(row_number__lte=self.nested_books_limit).order_by("title", "id")
+        return Author.objects.prefetch_related(
+            Prefetch("books", queryset=books)
+        )
+
+
+class AuthorListView(AuthorQuerysetMixin, generics.ListAPIView):
+    """
+    List authors (cursor paginated) with a book count and their first books by title.
+    """
+    serializer_class = AuthorSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = AuthorCursorPagination
+    # ?ordering=-book_count lists the most prolific authors first (indexed)
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ["book_count"]
+
+
+class AuthorDetailView(AuthorQuerysetMixin, generics.RetrieveAPIView):
+    """
+    Retrieve a single Author with a book count and their first books by title.
+    """
+    serializer_class = AuthorSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
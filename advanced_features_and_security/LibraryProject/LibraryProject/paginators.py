@@ -0,0 +1,126 @@
+# LibraryProject/paginators.py
+from django.core.paginator import EmptyPage, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+# Admin changelists of large tables.
+# The admin counts the filtered rows for the paginator and, by default, the
+# whole table again for "N total"; both are full scans on big tables.
+# EstimatedCountAdminMixin counts exactly only up to a threshold and skips
+# the second count. Past the threshold the changelist shows "~N" or "N+"
+# (admin/<app_label>/pagination.html) and any page number may be requested.
+
+
+def estimate_row_count(queryset):
+    """
+    The database's cheap estimate of the rows in queryset's table, or None.
+    SQLite: the highest rowid (exact until rows are deleted); PostgreSQL and
+    MySQL: the planner statistics, as fresh as the last ANALYZE.
+    """
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    if connection.vendor == "sqlite":
+        sql, params = f"SELECT MAX(_rowid_) FROM {connection.ops.quote_name(table)}", []
+    elif connection.vendor == "postgresql":
+        sql, params = "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)", [table]
+    elif connection.vendor == "mysql":
+        sql = (
+            "SELECT table_rows FROM information_schema.tables "
+            "WHERE table_schema = DATABASE() AND table_name = %s"
+        )
+        params = [table]
+    else:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    # reltuples is -1 for a table that was never analyzed
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that counts at most `threshold` rows. Past that, an unfiltered
+    list reports the database's row estimate and a filtered list reports
+    `threshold` (is_estimated is then True, and count_label reads "~N" or
+    "N+"). An estimated count puts no upper bound on the page number.
+    """
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True,
+                 threshold=10000):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page)
+        self.threshold = threshold
+        self.is_estimated = False
+
+    @cached_property
+    def count(self):
+        # COUNT(*) over a LIMIT subquery stops after threshold + 1 rows
+        capped = self.object_list.order_by()[:self.threshold + 1].count()
+        if capped <= self.threshold:
+            return capped
+        self.is_estimated = True
+        estimate = None
+        if not self.object_list.query.where:
+            estimate = estimate_row_count(self.object_list)
+        if estimate is None or estimate <= self.threshold:
+            # Only known to be more than threshold
+            return self.threshold
+        return estimate
+
+    @property
+    def count_label(self):
+        """The count for display: "~N" for a table estimate, "N+" past the threshold."""
+        count = self.count
+        if not self.is_estimated:
+            return str(count)
+        if count == self.threshold:
+            return f"{count}+"
+        return f"~{count}"
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)  # counts, setting is_estimated
+        except EmptyPage:
+            number = int(number)  # an integer, or super() would have raised PageNotAnInteger
+            if not self.is_estimated or number < 1:
+                raise
+            # Past an estimated count: page() finds out whether the page exists
+            return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.is_estimated:
+            return super().page(number)
+        # Don't cut the last page short at an estimated count
+        bottom = (number - 1) * self.per_page
+        object_list = self.object_list[bottom:bottom + self.per_page]
+        if number > 1 and not object_list:
+            raise EmptyPage(self.error_messages["no_results"])
+        return self._get_page(object_list, number, self)
+
+    def get_elided_page_range(self, number=1, *, on_each_side=3, on_ends=2):
+        number = self.validate_number(number)
+        paginator = self
+        if self.is_estimated and number >= self.num_pages:
+            # Links past the estimate: up to the page after the current one
+            paginator = Paginator(range((number + 1) * self.per_page), self.per_page)
+        return Paginator.get_elided_page_range(
+            paginator, number, on_each_side=on_each_side, on_ends=on_ends
+        )
+
+
+class EstimatedCountAdminMixin:
+    """
+    ModelAdmin mixin for large tables: changelists use EstimatedCountPaginator
+    and skip the unfiltered "N total" count.
+    """
+    paginator = EstimatedCountPaginator
+    count_threshold = 10000
+    show_full_result_count = False
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        return self.paginator(
+            queryset, per_page, orphans, allow_empty_first_page, threshold=self.count_threshold
+        )
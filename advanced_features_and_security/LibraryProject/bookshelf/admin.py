@@ -2,11 +2,12 @@
 from django.contrib import admin
 from .models import Book, CustomUser
 from django.contrib.auth.admin import UserAdmin
+from LibraryProject.paginators import EstimatedCountAdminMixin
 
 
 
 # Register your models here.
-class BookAdmin(admin.ModelAdmin):
+class BookAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     list_display = ('title', 'author', 'publication_year')
     search_fields = ('title', 'author')
     list_filter = ['author', 'publication_year']
@@ -1,6 +1,7 @@
 from django.contrib import admin
+from api_project.paginators import EstimatedCountAdminMixin
 from .models import Book
 
 @admin.register(Book)
-class BookAdmin(admin.ModelAdmin):
+class BookAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     list_display = ("title", "author", "published_date", "created_at")
@@ -0,0 +1,91 @@
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+# Token -> user lookups without a database query per request.
+# Two tiers: a small LRU in each process, in front of the shared Django cache.
+# api/signals.py drops an entry when its token is deleted or its user is saved
+# (e.g. deactivated); other processes notice within TOKEN_CACHE_LOCAL_TIMEOUT.
+
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU with a per-entry expiry."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + timeout)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+local_tokens = LRUCache(getattr(settings, "TOKEN_CACHE_LOCAL_SIZE", 1024))
+
+
+def token_cache_key(key):
+    # Never put the raw token in a cache key
+    return "auth:token:" + hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def invalidate_token(key):
+    name = token_cache_key(key)
+    local_tokens.delete(name)
+    cache.delete(name)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that reads the token and its user from the token cache.
+    Entries hold the pickled token (with its user), so every request gets its
+    own User instance, just like a database lookup.
+    Unknown tokens are not cached and always fall through to the database.
+    """
+
+    def authenticate_credentials(self, key):
+        name = token_cache_key(key)
+        data = local_tokens.get(name)
+        if data is None:
+            data = cache.get(name)
+            if data is None:
+                user, token = super().authenticate_credentials(key)
+                data = pickle.dumps(token)
+                cache.set(name, data, getattr(settings, "TOKEN_CACHE_TIMEOUT", 300))
+            local_tokens.set(name, data, getattr(settings, "TOKEN_CACHE_LOCAL_TIMEOUT", 10))
+
+        token = pickle.loads(data)
+        if not token.user.is_active:
+            raise AuthenticationFailed(_("User inactive or deleted."))
+        return (token.user, token)
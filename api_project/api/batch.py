@@ -0,0 +1,60 @@
+import io
+import json
+from urllib.parse import urlsplit
+
+from django.core.handlers.wsgi import WSGIRequest
+from django.urls import Resolver404, resolve
+from rest_framework.viewsets import ViewSetMixin
+
+# Sub-requests of BatchView.
+# Each one is dispatched straight to its view (no middleware, no second
+# authentication: the batch request's user and token are passed on the way
+# DRF's force_authenticate() does) and its Response data is collected unrendered.
+
+# Server details a sub-request shares with the batch request
+SHARED_META = (
+    "SERVER_NAME", "SERVER_PORT", "SERVER_PROTOCOL", "REMOTE_ADDR",
+    "HTTP_HOST", "HTTP_X_FORWARDED_PROTO", "HTTP_X_FORWARDED_HOST", "wsgi.url_scheme",
+)
+
+
+def resolve_viewset(path):
+    """Return the URL match for a router (ViewSet) URL, or None."""
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return None
+    if not issubclass(getattr(match.func, "cls", object), ViewSetMixin):
+        return None
+    return match
+
+
+def build_request(request, method, path, body=None):
+    """A request for one sub-request, authenticated as the batch request."""
+    url = urlsplit(path)
+    content = b"" if body is None else json.dumps(body).encode()
+    environ = {key: request.META[key] for key in SHARED_META if key in request.META}
+    environ.update({
+        "REQUEST_METHOD": method,
+        "PATH_INFO": url.path,
+        "QUERY_STRING": url.query,
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(content)),
+        "HTTP_ACCEPT": "application/json",
+        "wsgi.input": io.BytesIO(content),
+    })
+    environ.setdefault("SERVER_NAME", "localhost")
+    environ.setdefault("SERVER_PORT", "80")
+    sub_request = WSGIRequest(environ)
+    sub_request._force_auth_user = request.user
+    sub_request._force_auth_token = request.auth
+    return sub_request
+
+
+def run(request, method, path, body=None):
+    """Run one sub-request; returns {"status": ..., "body": ...}."""
+    match = resolve_viewset(urlsplit(path).path)
+    if match is None:
+        return {"status": 404, "body": {"detail": "Not a batchable URL."}}
+    response = match.func(build_request(request, method, path, body), *match.args, **match.kwargs)
+    return {"status": response.status_code, "body": getattr(response, "data", None)}
@@ -0,0 +1,27 @@
+from django.db import transaction
+
+from .models import BookChange
+
+# Change feed bookkeeping (see BookViewSet.changes).
+# Every write to a book logs a new BookChange row and removes that book's older
+# rows, so the log stays one row per book and a sync reads only what changed.
+# Writes that bypass signals (bulk_create, QuerySet.update/delete) must call
+# record_changes() themselves.
+# The feed relies on sequence numbers becoming visible in order, which holds
+# on SQLite (one writer at a time); with concurrent writers a client could
+# skip a change committed after a higher sequence number.
+
+
+def record_changes(book_ids, deleted=False):
+    """Log a change (or, with deleted=True, a tombstone) for each of book_ids."""
+    book_ids = list(book_ids)
+    if not book_ids:
+        return
+    with transaction.atomic():
+        changes = BookChange.objects.bulk_create(
+            [BookChange(book_id=book_id, deleted=deleted) for book_id in book_ids]
+        )
+        # Insert before deleting: SQLite reuses the highest rowid once it is
+        # deleted, which would hand out a sequence number a client already has
+        first = min(change.pk for change in changes)
+        BookChange.objects.filter(book_id__in=book_ids, pk__lt=first).delete()
@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+
+# Incremental readers for BookViewSet.import_books.
+# Both wrap the uploaded file in a text stream and yield one row at a time, so
+# memory use does not depend on the size of the upload (Django keeps large
+# uploads in a temporary file on disk).
+
+
+class RowError(Exception):
+    """A line that could not be read as a row; reported like a validation error."""
+
+
+def text_stream(upload):
+    # utf-8-sig drops the byte order mark spreadsheet exports often start with
+    return io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+
+
+def read_csv(upload):
+    """Yield (line number, row dict or RowError) for a CSV file with a header row."""
+    reader = csv.DictReader(text_stream(upload))
+    try:
+        reader.fieldnames
+    except csv.Error as exc:
+        yield 1, RowError(f"Invalid CSV header: {exc}")
+        return
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as exc:
+            # e.g. a field over csv.field_size_limit(); the reader carries on
+            # with the next line. line_num doesn't count the failed line yet.
+            yield reader.line_num + 1, RowError(f"Invalid CSV: {exc}")
+            continue
+        if None in row:
+            yield reader.line_num, RowError("More values than header columns.")
+            continue
+        # An empty cell means "no value", like a missing key in JSON
+        yield reader.line_num, {key: value for key, value in row.items() if value not in ("", None)}
+
+
+def read_json_lines(upload):
+    """Yield (line number, object or RowError) for a JSON-lines file; blank lines are skipped."""
+    for line_number, line in enumerate(text_stream(upload), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_number, RowError(f"Invalid JSON: {exc}")
+            continue
+        if not isinstance(row, dict):
+            yield line_number, RowError("Expected a JSON object.")
+            continue
+        yield line_number, row
+
+
+READERS = {
+    ".csv": read_csv,
+    ".jsonl": read_json_lines,
+    ".ndjson": read_json_lines,
+}
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:08
+
+from django.db import migrations, models
+
+
+def log_existing_books(apps, schema_editor):
+    # Existing books enter the feed in creation order, so since=0 returns the catalog
+    Book = apps.get_model("api", "Book")
+    BookChange = apps.get_model("api", "BookChange")
+    book_ids = Book.objects.order_by("created_at", "id").values_list("id", flat=True)
+    BookChange.objects.bulk_create(
+        (BookChange(book_id=book_id) for book_id in book_ids.iterator()), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('book_id', models.BigIntegerField(db_index=True)),
+                ('deleted', models.BooleanField(default=False)),
+            ],
+        ),
+        migrations.RunPython(log_existing_books, migrations.RunPython.noop),
+    ]
@@ -8,3 +8,16 @@ class Book(models.Model):
 
     def __str__(self):
         return f"{self.title} by {self.author}"
+
+
+class BookChange(models.Model):
+    """
+    Change log behind the books change feed: one row per book, its latest change.
+    The auto-increment id is the sequence clients sync from; rows with
+    deleted=True are tombstones for deleted books.
+    """
+    book_id = models.BigIntegerField(db_index=True)
+    deleted = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"#{self.pk} {'deleted' if self.deleted else 'changed'} book {self.book_id}"
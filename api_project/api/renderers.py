@@ -0,0 +1,26 @@
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils import encoders
+
+try:
+    import msgpack
+except ImportError:  # optional: MessagePack is offered only when installed
+    msgpack = None
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    MessagePack: a compact binary encoding of the same data the JSON renderer
+    outputs, for API clients that send Accept: application/msgpack.
+    Values msgpack has no type for (dates, decimals, UUIDs...) are converted
+    the way DRF's JSON encoder converts them.
+    """
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+    encoder_class = encoders.JSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=self.encoder_class().default, use_bin_type=True)
@@ -1,8 +1,44 @@
+from django.conf import settings
 from rest_framework import serializers
+from api_project.middleware import timed
 from .models import Book
 
+
+# List serializer that reports its work as "serialize" in Server-Timing
+class TimedListSerializer(serializers.ListSerializer):
+    @property
+    def data(self):
+        with timed("serialize"):
+            return super().data
+
+
 class BookSerializer(serializers.ModelSerializer):
     class Meta:
         model = Book
         fields = "__all__"
+        list_serializer_class = TimedListSerializer
+
+    @property
+    def data(self):
+        with timed("serialize"):
+            return super().data
+
+
+class ChangeFeedParamsSerializer(serializers.Serializer):
+    """Query parameters of the books change feed."""
+    since = serializers.IntegerField(min_value=0, default=0)
+    limit = serializers.IntegerField(min_value=1, max_value=1000, default=500)
+
+
+class BatchItemSerializer(serializers.Serializer):
+    """One sub-request of a batch."""
+    method = serializers.ChoiceField(choices=["GET", "POST", "PUT", "PATCH", "DELETE"])
+    path = serializers.RegexField(r"^/", max_length=2000)
+    body = serializers.JSONField(required=False)
+
 
+class BatchSerializer(serializers.Serializer):
+    requests = BatchItemSerializer(
+        many=True, allow_empty=False, max_length=getattr(settings, "BATCH_MAX_REQUESTS", 50)
+    )
+    atomic = serializers.BooleanField(default=False)
@@ -0,0 +1,49 @@
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_token
+from .changes import record_changes
+from .models import Book
+
+
+# Drop cached token lookups (see api/authentication.py) when they may be stale.
+# Only once the write commits: dropping them earlier lets a concurrent request
+# cache the old rows again before the new ones are visible.
+
+# User fields that authentication doesn't depend on; saves touching only these
+# (e.g. update_last_login() on every login) leave the cached tokens alone
+UNCACHED_USER_FIELDS = frozenset({"last_login"})
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidate_cached_token(sender, instance, **kwargs):
+    transaction.on_commit(partial(invalidate_token, instance.key), using=kwargs.get("using"))
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_user_tokens(sender, instance, created, update_fields=None, using=None, **kwargs):
+    # Deactivation, permission flags or any other change to the cached user.
+    # A full save() may have changed any of them; a new user has no tokens yet.
+    if created or (update_fields is not None and update_fields <= UNCACHED_USER_FIELDS):
+        return
+    keys = list(Token.objects.using(using).filter(user=instance).values_list("key", flat=True))
+    for key in keys:
+        transaction.on_commit(partial(invalidate_token, key), using=using)
+
+
+# Feed book writes into the change log (see api/changes.py)
+
+@receiver(post_save, sender=Book)
+def log_book_change(sender, instance, **kwargs):
+    record_changes([instance.pk])
+
+
+@receiver(post_delete, sender=Book)
+def log_book_deletion(sender, instance, **kwargs):
+    record_changes([instance.pk], deleted=True)
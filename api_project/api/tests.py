@@ -1,3 +1,445 @@
-from django.test import TestCase
+import csv
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.paginator import EmptyPage
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from api_project.paginators import EstimatedCountPaginator
+
+from .admin import BookAdmin
+from .authentication import LRUCache, local_tokens
+from .changes import record_changes
+from .models import Book, BookChange
+from .renderers import msgpack
+
+
+class ServerTimingTestCase(APITestCase):
+    """
+    Tests for the Server-Timing middleware.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="reader", password="testpass123")
+        self.client.force_authenticate(self.user)
+        Book.objects.create(title="Timed", author="Someone")
+
+    def test_header(self):
+        response = self.client.get(reverse("book-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        metrics = [part.split(";")[0].strip() for part in response["Server-Timing"].split(",")]
+        self.assertEqual(metrics, ["db", "serialize", "render", "total"])
+        self.assertIn('desc="1 query"', response["Server-Timing"])
+
+    def test_structured_log_line(self):
+        with self.assertLogs("server_timing", level="INFO") as logs:
+            self.client.get(reverse("book-list"))
+        self.assertEqual(logs.records[0].status, 200)
+        self.assertEqual(logs.records[0].queries, 1)
+
+
+@skipUnless(msgpack, "msgpack is not installed")
+class MessagePackTestCase(APITestCase):
+    """
+    MessagePack is negotiated with Accept / Content-Type and carries the same data as JSON.
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username="admin", password="testpass123")
+        self.client.force_authenticate(self.admin)
+        Book.objects.create(title="Packed", author="Someone")
+
+    def test_list(self):
+        url = reverse("book-list")
+        packed = self.client.get(url, HTTP_ACCEPT="application/msgpack")
+        self.assertEqual(packed["Content-Type"], "application/msgpack")
+        self.assertEqual(msgpack.unpackb(packed.content), self.client.get(url).json())
+
+    def test_create_from_msgpack_body(self):
+        body = msgpack.packb({"title": "Binary", "author": "Packer"})
+        response = self.client.post(
+            reverse("book_all-list"), body, content_type="application/msgpack",
+            HTTP_ACCEPT="application/msgpack",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(msgpack.unpackb(response.content)["title"], "Binary")
+
+    def test_malformed_body(self):
+        response = self.client.post(
+            reverse("book_all-list"), b"\xc1", content_type="application/msgpack"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class CachedTokenAuthenticationTestCase(APITestCase):
+    """
+    Token lookups come from the token cache after the first request.
+    """
+
+    def setUp(self):
+        cache.clear()
+        local_tokens.clear()
+        self.user = User.objects.create_user(username="tokenuser", password="testpass123")
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.url = reverse("book-list")
+
+    def test_repeat_requests_skip_auth_tables(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        tables = " ".join(query["sql"] for query in ctx.captured_queries)
+        self.assertNotIn("authtoken_token", tables)
+        self.assertNotIn("auth_user", tables)
+
+    def test_shared_cache_fills_local_lru(self):
+        self.client.get(self.url)
+        local_tokens.clear()
+        with self.assertNumQueries(1):  # only the books
+            self.client.get(self.url)
+
+    def test_deleted_token_rejected(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_invalidation_waits_for_commit(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.token.delete()
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        self.assertEqual(len(callbacks), 1)
+
+    def test_login_keeps_cached_tokens(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.login(username="tokenuser", password="testpass123")
+        self.assertEqual(callbacks, [])
+
+    def test_invalid_token_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Token nope")
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_lru_is_bounded(self):
+        lru = LRUCache(max_size=2)
+        lru.set("a", 1, 60)
+        lru.set("b", 2, 60)
+        lru.get("a")
+        lru.set("c", 3, 60)
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual((lru.get("a"), lru.get("c")), (1, 3))
+
+
+class BookImportTestCase(APITestCase):
+    """
+    Tests for the streaming CSV / JSON-lines import on BookViewSet.
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username="admin", password="testpass123")
+        self.client.force_authenticate(self.admin)
+        self.url = reverse("book_all-import-books")
+
+    def upload(self, name, content):
+        return self.client.post(
+            self.url, {"file": SimpleUploadedFile(name, content.encode())}, format="multipart"
+        )
+
+    def test_csv(self):
+        content = (
+            "﻿title,author,published_date\n"
+            "Dune,Frank Herbert,1965-08-01\n"
+            ",Nobody,\n"
+            "Emma,Jane Austen,\n"
+            "Bad Date,Someone,yesterday\n"
+        )
+        response = self.upload("books.csv", content)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(response.data["failed"], 2)
+        self.assertEqual([error["line"] for error in response.data["errors"]], [3, 5])
+        self.assertIn("title", response.data["errors"][0]["errors"])
+        self.assertIn("published_date", response.data["errors"][1]["errors"])
+        self.assertIsNone(Book.objects.get(title="Emma").published_date)
+
+    def test_csv_field_too_large(self):
+        huge = "x" * (csv.field_size_limit() + 1)
+        content = f"title,author\nDune,Frank Herbert\n{huge},Nobody\nEmma,Jane Austen\n"
+        response = self.upload("books.csv", content)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.data["created"], response.data["failed"]), (2, 1))
+        self.assertEqual(response.data["errors"][0]["line"], 3)
+
+    def test_json_lines(self):
+        content = (
+            '{"title": "Dune", "author": "Frank Herbert", "published_date": "1965-08-01"}\n'
+            "\n"
+            "not json\n"
+            '["a list"]\n'
+            '{"title": "Emma", "author": "Jane Austen"}\n'
+        )
+        response = self.upload("books.jsonl", content)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual([error["line"] for error in response.data["errors"]], [3, 4])
+        self.assertEqual(Book.objects.count(), 2)
+
+    @override_settings(BOOK_IMPORT_BATCH_SIZE=2)
+    def test_batches(self):
+        rows = "".join(f"Book {i},Author {i},\n" for i in range(5))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.upload("books.csv", "title,author,published_date\n" + rows)
+        self.assertEqual(response.data["created"], 5)
+        inserts = [q for q in queries.captured_queries if q["sql"].startswith('INSERT INTO "api_book"')]
+        self.assertEqual(len(inserts), 3)
+
+    def test_rejected_files(self):
+        self.assertEqual(self.upload("books.xlsx", "x").status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(
+            self.url, {"file": SimpleUploadedFile("books.csv", b"title,author\nA,\xff\n")},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Book.objects.count(), 0)
+        self.assertEqual(self.client.post(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_admin_only(self):
+        self.client.force_authenticate(User.objects.create_user(username="reader", password="x"))
+        self.assertEqual(self.upload("books.csv", "title,author\nA,B\n").status_code, status.HTTP_403_FORBIDDEN)
+
+
+class BookChangeFeedTestCase(APITestCase):
+    """
+    Tests for the books change feed (BookViewSet.changes).
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="mobile", password="testpass123")
+        self.client.force_authenticate(self.user)
+        self.url = reverse("book_all-changes")
+        self.dune = Book.objects.create(title="Dune", author="Frank Herbert")
+        self.emma = Book.objects.create(title="Emma", author="Jane Austen")
+
+    def sync(self, since=0, **params):
+        response = self.client.get(self.url, {"since": since, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_full_then_incremental_sync(self):
+        first = self.sync()
+        self.assertEqual([book["title"] for book in first["results"]], ["Dune", "Emma"])
+        self.assertEqual(first["deleted"], [])
+
+        self.assertEqual(self.sync(first["cursor"])["results"], [])
+
+        self.dune.title = "Dune Messiah"
+        self.dune.save()
+        emma_id = self.emma.pk
+        self.emma.delete()
+        Book.objects.create(title="Ulysses", author="James Joyce")
+        second = self.sync(first["cursor"])
+        self.assertEqual([book["title"] for book in second["results"]], ["Dune Messiah", "Ulysses"])
+        self.assertEqual(second["deleted"], [emma_id])
+        self.assertGreater(second["cursor"], first["cursor"])
+
+    def test_one_log_row_per_book(self):
+        for year in range(3):
+            self.dune.title = f"Dune {year}"
+            self.dune.save()
+        self.assertEqual(BookChange.objects.filter(book_id=self.dune.pk).count(), 1)
+        self.assertEqual(len(self.sync()["results"]), 2)
+
+    def test_pages(self):
+        first = self.sync(limit=1)
+        self.assertTrue(first["has_more"])
+        second = self.sync(first["cursor"], limit=1)
+        self.assertFalse(second["has_more"])
+        self.assertEqual(second["results"][0]["title"], "Emma")
+
+    def test_query_count_does_not_grow_with_catalog(self):
+        books = Book.objects.bulk_create([Book(title=f"Old {i}", author="A") for i in range(50)])
+        record_changes(book.pk for book in books)
+        cursor = self.sync()["cursor"]
+        Book.objects.create(title="New", author="B")
+        with CaptureQueriesContext(connection) as queries:
+            data = self.sync(cursor)
+        self.assertEqual([book["title"] for book in data["results"]], ["New"])
+        self.assertLessEqual(len(queries), 2)
+
+    def test_import_is_logged(self):
+        cursor = self.sync()["cursor"]
+        admin = User.objects.create_superuser(username="admin", password="testpass123")
+        self.client.force_authenticate(admin)
+        self.client.post(
+            reverse("book_all-import-books"),
+            {"file": SimpleUploadedFile("books.csv", b"title,author\nImported,Someone\n")},
+            format="multipart",
+        )
+        self.assertEqual([book["title"] for book in self.sync(cursor)["results"]], ["Imported"])
+
+    def test_invalid_params(self):
+        response = self.client.get(self.url, {"since": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {"limit": 5000})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BatchTestCase(APITestCase):
+    """
+    Tests for the batch endpoint running several router requests in one.
+    """
+
+    def setUp(self):
+        cache.clear()
+        local_tokens.clear()
+        self.admin = User.objects.create_superuser(username="admin", password="testpass123")
+        self.token = Token.objects.create(user=self.admin)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.book = Book.objects.create(title="Dune", author="Frank Herbert")
+        self.url = reverse("batch")
+
+    def detail(self, book):
+        return reverse("book_all-detail", args=[book.pk])
+
+    def test_runs_each_sub_request(self):
+        response = self.client.post(self.url, {"requests": [
+            {"method": "POST", "path": reverse("book_all-list"), "body": {"title": "Emma", "author": "Jane Austen"}},
+            {"method": "PATCH", "path": self.detail(self.book), "body": {"title": "Dune Messiah"}},
+            {"method": "GET", "path": reverse("book_all-list") + "?format=json"},
+            {"method": "DELETE", "path": self.detail(self.book)},
+            {"method": "GET", "path": "/api/nowhere/"},
+        ]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["status"] for item in response.data], [201, 200, 200, 204, 404])
+        self.assertEqual(response.data[1]["body"]["title"], "Dune Messiah")
+        self.assertEqual(len(response.data[2]["body"]), 2)
+        self.assertEqual(list(Book.objects.values_list("title", flat=True)), ["Emma"])
+
+    def test_authenticates_once(self):
+        items = [{"method": "GET", "path": self.detail(self.book)}] * 5
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {"requests": items}, format="json")
+        self.assertEqual([item["status"] for item in response.data], [200] * 5)
+        token_queries = [q for q in queries.captured_queries if "authtoken_token" in q["sql"]]
+        self.assertEqual(len(token_queries), 1)
+
+    def test_atomic_rolls_back(self):
+        response = self.client.post(self.url, {"atomic": True, "requests": [
+            {"method": "POST", "path": reverse("book_all-list"), "body": {"title": "Emma", "author": "Jane Austen"}},
+            {"method": "POST", "path": reverse("book_all-list"), "body": {"author": "No title"}},
+            {"method": "DELETE", "path": self.detail(self.book)},
+        ]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([item["status"] for item in response.data], [201, 400])
+        self.assertEqual(list(Book.objects.values_list("title", flat=True)), ["Dune"])
+
+    def test_sub_requests_keep_view_permissions(self):
+        reader = User.objects.create_user(username="reader", password="testpass123")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=reader).key}")
+        response = self.client.post(self.url, {"requests": [
+            {"method": "DELETE", "path": self.detail(self.book)},
+            {"method": "GET", "path": reverse("book-list")},
+        ]}, format="json")
+        self.assertEqual([item["status"] for item in response.data], [403, 404])
+        self.assertTrue(Book.objects.exists())
+
+    def test_invalid_batch(self):
+        self.assertEqual(self.client.post(self.url, {"requests": []}, format="json").status_code, 400)
+        response = self.client.post(self.url, {"requests": [{"method": "TRACE", "path": "/"}]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.credentials()
+        self.assertEqual(self.client.post(self.url, {}, format="json").status_code, 401)
+
+
+class SQLitePragmaTestCase(APITestCase):
+    """
+    New SQLite connections get the SQLITE_PRAGMAS profile.
+    """
+
+    def test_profile_applied(self):
+        connection.ensure_connection()
+        db = connection.connection
+        self.assertEqual(db.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+        self.assertEqual(db.execute("PRAGMA busy_timeout").fetchone()[0], 5000)
+
+
+class EstimatedCountAdminTestCase(APITestCase):
+    """
+    Tests for the estimated-count paginator on the Book admin changelist.
+    """
+
+    def setUp(self):
+        Book.objects.bulk_create([Book(title=f"Book {i}", author=f"Author {i % 3}") for i in range(30)])
+        self.admin = User.objects.create_superuser(username="admin", password="testpass123")
+        self.client.force_login(self.admin)
+        self.url = reverse("admin:api_book_changelist")
+
+    def paginator(self, queryset, threshold=10):
+        return EstimatedCountPaginator(queryset, 5, threshold=threshold)
+
+    def test_exact_below_threshold(self):
+        paginator = self.paginator(Book.objects.order_by("id"), threshold=100)
+        self.assertEqual(paginator.count, 30)
+        self.assertFalse(paginator.is_estimated)
+
+    def test_estimated_above_threshold(self):
+        Book.objects.filter(title="Book 0").delete()
+        paginator = self.paginator(Book.objects.order_by("id"))
+        self.assertEqual(paginator.count, 30)  # highest rowid, not the 29 left
+        self.assertTrue(paginator.is_estimated)
+        self.assertEqual(len(paginator.page(6).object_list), 4)
+
+    def test_filtered_above_threshold_is_capped(self):
+        paginator = self.paginator(Book.objects.filter(title__startswith="Book").order_by("id"))
+        self.assertEqual(paginator.count, 10)
+        self.assertEqual(paginator.count_label, "10+")
+        self.assertEqual(len(paginator.page(2).object_list), 5)
+
+    def test_pages_past_estimate(self):
+        paginator = self.paginator(Book.objects.filter(title__startswith="Book").order_by("id"))
+        self.assertEqual(paginator.page(6)[0].title, "Book 25")
+        self.assertEqual(list(paginator.get_elided_page_range(6)), [1, 2, 3, 4, 5, 6, 7])
+        with self.assertRaises(EmptyPage):
+            paginator.page(7)
+        with self.assertRaises(EmptyPage):
+            paginator.page(0)
+
+    def test_exact_count_keeps_page_bound(self):
+        paginator = self.paginator(Book.objects.order_by("id"), threshold=100)
+        self.assertEqual(paginator.count_label, "30")
+        with self.assertRaises(EmptyPage):
+            paginator.page(7)
+
+    @mock.patch.object(BookAdmin, "count_threshold", 10)
+    def test_changelist_skips_full_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {"author": "Author 1"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["cl"].result_count, 10)
+        counts = [q["sql"] for q in queries.captured_queries if "COUNT(" in q["sql"]]
+        self.assertEqual(len(counts), 1)
+        self.assertIn("LIMIT 11", counts[0])
+
+    @mock.patch.object(BookAdmin, "count_threshold", 10)
+    def test_changelist_shows_estimate(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, "~30 books")
+        response = self.client.get(self.url, {"title__startswith": "Book", "p": 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "10+ books")
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import BookList, BookViewSet
+from .views import BatchView, BookList, BookViewSet
 
 # Create a router and register the ViewSet
 router = DefaultRouter()
@@ -10,6 +10,9 @@ urlpatterns = [
     # Existing ListAPIView route
     path('books/', BookList.as_view(), name='book-list'),
 
+    # Several router requests in one (see BatchView)
+    path('batch/', BatchView.as_view(), name='batch'),
+
     # Router URLs for CRUD
     path('', include(router.urls)),
 ]
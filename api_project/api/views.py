@@ -1,7 +1,18 @@
-from rest_framework import generics, viewsets
+import os
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework import generics, serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
-from .models import Book
-from .serializers import BookSerializer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from . import batch
+from .changes import record_changes
+from .imports import READERS, RowError
+from .models import Book, BookChange
+from .serializers import BatchSerializer, BookSerializer, ChangeFeedParamsSerializer
 
 class BookList(generics.ListAPIView):
     queryset = Book.objects.all()
@@ -9,7 +20,127 @@ class BookList(generics.ListAPIView):
     permission_classes = [IsAuthenticated]  # Require login
 
 
+class BatchRollback(Exception):
+    pass
+
+
+class BatchView(APIView):
+    """
+    Runs a list of sub-requests ({"method", "path", "body"}) against the
+    router URLs in one HTTP request, authenticated once, and returns their
+    responses as [{"status": ..., "body": ...}, ...]. Each sub-request is still
+    checked by its own view's permissions.
+    With "atomic": true they share one transaction, and the first failing
+    sub-request rolls everything back: the response is then a 400 listing the
+    responses up to and including the failure.
+    """
+
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data["requests"]
+
+        if not serializer.validated_data["atomic"]:
+            return Response([
+                batch.run(request, item["method"], item["path"], item.get("body")) for item in items
+            ])
+
+        responses = []
+        try:
+            with transaction.atomic():
+                for item in items:
+                    responses.append(batch.run(request, item["method"], item["path"], item.get("body")))
+                    if responses[-1]["status"] >= 400:
+                        raise BatchRollback
+        except BatchRollback:
+            return Response(responses, status=status.HTTP_400_BAD_REQUEST)
+        return Response(responses)
+
+
 class BookViewSet(viewsets.ModelViewSet):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAdminUser]  # Only admins can create/update/delete
+    import_max_errors = 1000  # errors reported per import; the rest are only counted
+
+    @action(detail=False, methods=["post"], url_path="import", parser_classes=[MultiPartParser])
+    def import_books(self, request):
+        """
+        Import books from an uploaded CSV (.csv, with a header row) or
+        JSON-lines (.jsonl / .ndjson) file in the "file" form field.
+        Rows are read one at a time, validated with BookSerializer and
+        inserted with bulk_create() in batches; invalid rows are reported as
+        {"line": ..., "errors": ...} and skipped.
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise serializers.ValidationError({"file": ["No file was submitted."]})
+        extension = os.path.splitext(upload.name)[1].lower()
+        if extension not in READERS:
+            raise serializers.ValidationError(
+                {"file": [f"Unsupported file type; use one of {', '.join(sorted(READERS))}."]}
+            )
+
+        batch_size = getattr(settings, "BOOK_IMPORT_BATCH_SIZE", 1000)
+        serializer = self.get_serializer()
+        created = failed = 0
+        errors = []
+        batch = []
+        try:
+            with transaction.atomic():
+                for line, row in READERS[extension](upload):
+                    try:
+                        if isinstance(row, RowError):
+                            raise serializers.ValidationError({"detail": [str(row)]})
+                        batch.append(Book(**serializer.run_validation(row)))
+                    except serializers.ValidationError as exc:
+                        failed += 1
+                        if len(errors) < self.import_max_errors:
+                            errors.append({"line": line, "errors": exc.detail})
+                        continue
+                    if len(batch) == batch_size:
+                        created += self.insert_batch(batch)
+                        batch = []
+                created += self.insert_batch(batch)
+        except UnicodeDecodeError:
+            # Nothing is kept from a file that is not UTF-8
+            raise serializers.ValidationError({"file": ["The file is not UTF-8 encoded."]})
+
+        return Response(
+            {"created": created, "failed": failed, "errors": errors},
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    def insert_batch(self, books):
+        # bulk_create() skips post_save, so log the change feed entries here
+        Book.objects.bulk_create(books)
+        record_changes(book.pk for book in books)
+        return len(books)
+
+    @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated])
+    def changes(self, request):
+        """
+        Change feed for syncing clients: books created or updated, and ids of
+        books deleted, after the ?since= cursor (0 for a full sync), oldest
+        first, at most ?limit= changes per page. Pass the returned "cursor" as
+        since next time, and keep going while "has_more" is true.
+        """
+        params = ChangeFeedParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        since, limit = params.validated_data["since"], params.validated_data["limit"]
+
+        changes = list(BookChange.objects.filter(pk__gt=since).order_by("pk")[:limit + 1])
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        books = Book.objects.in_bulk([c.book_id for c in changes if not c.deleted])
+        # A book deleted after the log was read is reported as deleted now
+        # and again (harmlessly) by its tombstone on the next sync
+        deleted = [c.book_id for c in changes if c.book_id not in books]
+        changed = [books[c.book_id] for c in changes if c.book_id in books]
+
+        return Response({
+            "results": self.get_serializer(changed, many=True).data,
+            "deleted": deleted,
+            "cursor": changes[-1].pk if changes else since,
+            "has_more": has_more,
+        })
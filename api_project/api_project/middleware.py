@@ -0,0 +1,149 @@
+# api_project/middleware.py
+import contextlib
+import contextvars
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger("server_timing")
+
+_current_timing = contextvars.ContextVar("server_timing", default=None)
+
+
+class RequestTiming:
+    """
+    Timings collected for one request.
+    Called by execute_wrapper() to count queries and DB time.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.phases = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - start
+            self.queries += 1
+
+    def add(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+
+def execute_wrapper(execute, sql, params, many, context):
+    """
+    Installed on every connection. Connections are per thread and the async
+    ORM runs queries in a worker thread, so the request is found through the
+    context variable (which sync_to_async carries over) and not the connection.
+    """
+    timing = _current_timing.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    return timing(execute, sql, params, many, context)
+
+
+def install_execute_wrapper(connection, **kwargs):
+    if execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(execute_wrapper)
+
+
+connection_created.connect(install_execute_wrapper)
+
+
+@contextlib.contextmanager
+def timed(name):
+    """
+    Time a block of view code (e.g. timed("serialize")) into the current
+    request's Server-Timing header. Does nothing outside a request.
+    """
+    timing = _current_timing.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timing is not None:
+            timing.add(name, time.perf_counter() - start)
+
+
+class ServerTimingMiddleware:
+    """
+    Adds a Server-Timing header and a structured log line to every response:
+    query count, DB time, serializer time (where views use timed()),
+    render time and total time.
+    Queries are counted with a connection execute wrapper, so it does not
+    need DEBUG and is cheap enough to leave on in production.
+    Put it first in MIDDLEWARE so "total" covers the other middleware.
+    """
+
+    sync_capable = True
+    async_capable = True  # async views stay async under ASGI
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        # Connections opened before the middleware was loaded
+        for alias in connections:
+            install_execute_wrapper(connections[alias])
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timing, token, start = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_timing.reset(token)
+        return self.finish(request, response, timing, start)
+
+    async def __acall__(self, request):
+        timing, token, start = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_timing.reset(token)
+        return self.finish(request, response, timing, start)
+
+    def start(self):
+        timing = RequestTiming()
+        return timing, _current_timing.set(timing), time.perf_counter()
+
+    def finish(self, request, response, timing, start):
+        total = time.perf_counter() - start
+
+        noun = "query" if timing.queries == 1 else "queries"
+        metrics = [("db", timing.db, f"{timing.queries} {noun}")]
+        metrics += [(name, seconds, None) for name, seconds in timing.phases.items()]
+        metrics.append(("total", total, None))
+        response["Server-Timing"] = ", ".join(
+            f"{name};dur={seconds * 1000:.2f}" + (f';desc="{desc}"' if desc else "")
+            for name, seconds, desc in metrics
+        )
+
+        fields = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": timing.queries,
+            **{f"{name}_ms": round(seconds * 1000, 2) for name, seconds, _ in metrics},
+        }
+        logger.info(" ".join(f"{key}={value}" for key, value in fields.items()), extra=fields)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this hook; time until the
+        # post-render callback fires
+        timing = _current_timing.get()
+        if timing is not None:
+            start = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: timing.add("render", time.perf_counter() - start)
+            )
+        return response
@@ -0,0 +1,57 @@
+# api_project/sqlite.py
+import re
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# SQLite performance profile: PRAGMAs run on every new SQLite connection.
+# The defaults trade a little durability on power loss (synchronous=NORMAL
+# in WAL mode can lose the last commits, never corrupts) for much faster
+# commits, and let readers work while a writer holds the database.
+# journal_mode is not in the profile: it is stored in the database file, so
+# setting it per connection would rewrite the checked-in db.sqlite3. Switch a
+# deployed database to WAL once with `PRAGMA journal_mode = wal` (manage.py
+# dbshell); every later connection then uses it.
+# Override with the SQLITE_PRAGMAS setting (advanced-api-project has a
+# `bench_sqlite` command comparing profiles).
+
+DEFAULT_PRAGMAS = {
+    "synchronous": "normal",    # fsync at checkpoints, not on every commit
+    "busy_timeout": 5000,       # ms to wait for a lock before "database is locked"
+    "cache_size": -20000,       # page cache in KiB (negative) per connection
+    "mmap_size": 134217728,     # read through 128 MiB of memory-mapped I/O
+    "temp_store": "memory",     # temporary tables and sort files in memory
+}
+
+# Values are interpolated into the statement, so only numbers and keywords
+PRAGMA_NAME = re.compile(r"^[a-z_]+$")
+PRAGMA_VALUE = re.compile(r"^(-?[0-9]+|[A-Za-z_]+)$")
+
+
+def get_pragmas():
+    return getattr(settings, "SQLITE_PRAGMAS", DEFAULT_PRAGMAS)
+
+
+def pragma_statements(pragmas):
+    """PRAGMA statements for a {name: value} profile, e.g. "PRAGMA synchronous = normal"."""
+    statements = []
+    for name, value in pragmas.items():
+        if not PRAGMA_NAME.match(name) or not PRAGMA_VALUE.match(str(value)):
+            raise ValueError(f"Invalid SQLite PRAGMA {name!r} = {value!r}")
+        statements.append(f"PRAGMA {name} = {value}")
+    return statements
+
+
+def apply_pragmas(cursor, pragmas):
+    """Run a PRAGMA profile on a DB-API cursor."""
+    for statement in pragma_statements(pragmas):
+        cursor.execute(statement)
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor, get_pragmas())
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:15
+
+import taggit.managers
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_alter_post_tags'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='published_date',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        # Post.tags moved to django-taggit without a migration (0004 is empty).
+        # Record that in the migration state only: taggit's own tables hold the
+        # tags, and the old blog_post_tags table is left untouched.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='post',
+                    name='tags',
+                    field=taggit.managers.TaggableManager(help_text='A comma-separated list of tags.', through='taggit.TaggedItem', to='taggit.Tag', verbose_name='Tags'),
+                ),
+            ],
+        ),
+    ]
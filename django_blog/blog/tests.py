@@ -1,3 +1,65 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.urls import reverse
+
+from .models import Post
+from .views import PostByTagListView, PostListView, SearchResultsView
+
+
+class PostListQueryTests(TestCase):
+    """
+    Post lists fetch authors and tags for the whole page: the number of
+    queries doesn't depend on how many posts are shown.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        authors = [User.objects.create_user(username=f"writer{i}", password="pass12345") for i in range(3)]
+        for i in range(25):
+            post = Post.objects.create(
+                title=f"Django tips {i}", content="Some content", author=authors[i % 3]
+            )
+            post.tags.add("django", f"topic{i % 4}")
+
+    def assert_constant_queries(self, view, url, params=None):
+        # count, posts (with authors), tags
+        for page_size in (2, 20):
+            with mock.patch.object(view, "paginate_by", page_size):
+                with self.assertNumQueries(3):
+                    response = self.client.get(url, params)
+            self.assertEqual(len(response.context["posts"]), page_size)
+        return response
+
+    def test_post_list(self):
+        response = self.assert_constant_queries(PostListView, reverse("post-list"))
+        self.assertContains(response, "writer")
+        self.assertContains(response, "topic")
+
+    def test_posts_by_tag(self):
+        response = self.assert_constant_queries(PostByTagListView, reverse("posts-by-tag", args=["django"]))
+        self.assertContains(response, "topic")
+
+    def test_search_results(self):
+        response = self.assert_constant_queries(SearchResultsView, reverse("search-results"), {"q": "tips"})
+        self.assertContains(response, "writer")
+
+    def test_pages_list_every_post_once(self):
+        for view, url, params in [
+            (PostListView, reverse("post-list"), {}),
+            (PostByTagListView, reverse("posts-by-tag", args=["django"]), {}),
+            (SearchResultsView, reverse("search-results"), {"q": "tips"}),
+        ]:
+            titles = []
+            with mock.patch.object(view, "paginate_by", 2):
+                for page in range(1, 14):
+                    response = self.client.get(url, {**params, "page": page})
+                    titles += [post.title for post in response.context["posts"]]
+            # Every post once, newest first (no post has a published_date)
+            self.assertEqual(titles, [f"Django tips {i}" for i in reversed(range(25))])
 
-# Create your tests here.
+    def test_post_list_is_paginated(self):
+        response = self.client.get(reverse("post-list"), {"page": 3})
+        self.assertEqual(len(response.context["posts"]), 5)
+        self.assertContains(response, "Page 3 of 3")
@@ -50,12 +50,19 @@ class CustomLogoutView(LogoutView):
 # Blog Post CRUD Views
 # ==============================
 
+# published_date is usually NULL, so pages need the tie-breakers to be stable
+POST_ORDERING = ("-published_date", "-created_at", "-pk")
+
+
 class PostListView(ListView):
     """List all blog posts."""
     model = Post
+    # Author and tags are shown for every post: fetch them for the whole page at once
+    queryset = Post.objects.select_related("author").prefetch_related("tags")
     template_name = "blog/post_list.html"
     context_object_name = "posts"
-    ordering = ["-published_date"]
+    ordering = POST_ORDERING
+    paginate_by = 10
 
 
 class PostDetailView(DetailView):
@@ -188,7 +195,12 @@ class PostByTagListView(ListView):
 
     def get_queryset(self):
         tag_slug = self.kwargs.get('tag_slug')
-        return Post.objects.filter(tags__slug=tag_slug).order_by('-published_date')
+        return (
+            Post.objects.filter(tags__slug=tag_slug)
+            .select_related('author')
+            .prefetch_related('tags')
+            .order_by(*POST_ORDERING)
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -211,4 +223,4 @@ class SearchResultsView(ListView):
             Q(title__icontains=query) |
             Q(content__icontains=query) |
             Q(tags__name__icontains=query)
-        ).distinct().order_by('-published_date')
+        ).distinct().select_related('author').prefetch_related('tags').order_by(*POST_ORDERING)